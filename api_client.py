@@ -1,171 +1,540 @@
+import contextvars
+import copy
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from datetime import datetime
 import config
+import deadline
+from breaker import CircuitBreaker
+from cache import MISSING, TTLCache
+from metrics import registry
+from singleflight import SingleFlight
+
+
+# Responses worth retrying for idempotent requests
+RETRY_STATUSES = (502, 503, 504)
+
+
+class BackendRejection(str):
+    """Error message of a request the backend answered with a 4xx
+    
+    Failures are otherwise plain strings, so this tells a request the
+    backend refused apart from one that never got an answer (a 5xx, a
+    timeout, a connection error or an open circuit breaker).
+    """
+
+
+def _repeats_page(page, previous):
+    """Whether a page holds exactly the same payments as the page before it"""
+    return isinstance(page, list) and bool(page) and page == previous
+
+
+def _parse_response(response, ok_statuses=(200,), raw_errors=False):
+    """Turn a backend response into a (success, payload) tuple"""
+    if response.status_code in ok_statuses:
+        return True, response.json()
+    if response.status_code >= 500:
+        return False, response.text
+    if raw_errors:
+        return False, BackendRejection(response.text)
+    try:
+        return False, BackendRejection(response.json().get('error', 'Unknown error'))
+    except ValueError:
+        return False, BackendRejection(response.text)
+
+
+def _pool_counts(session):
+    """Return (connections opened, requests served) across a session's pools"""
+    opened = served = 0
+    # The same adapter is mounted for both schemes, count each one once
+    adapters = {id(adapter): adapter for adapter in session.adapters.values()}
+    for adapter in adapters.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                served += pool.num_requests
+    return opened, served
+
+
+class _Validated:
+    """A response body kept with its validators and the values derived from it"""
+    
+    __slots__ = ('etag', 'last_modified', 'body', 'derived')
+    
+    def __init__(self, etag, last_modified, body):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+        self.derived = {}  # transform -> result
+    
+    def request_headers(self):
+        """Headers that make the next request for this resource conditional"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+    
+    def derive(self, transform):
+        """Apply a transform to the body, computing it only once per body"""
+        result = self.derived.get(transform, MISSING)
+        if result is MISSING:
+            result = self.derived[transform] = transform(self.body)
+        return result
+
 
 class LipiaClient:
     """Client for interacting with the Lipia API"""
     
-    def __init__(self, base_url=None, api_key=None):
+    def __init__(self, base_url=None, api_key=None, pool_connections=None, pool_maxsize=None, max_idle=None, metrics=None):
         """Initialize the client with API settings"""
         self.base_url = base_url or config.API_URL
         self.api_key = api_key or config.API_KEY
-        self.timeout = 30  # Request timeout in seconds
+        self.connect_timeout = config.API_CONNECT_TIMEOUT  # Seconds to establish a connection
+        self.read_timeout = config.API_READ_TIMEOUT  # Seconds to wait for response data
+        self.max_retries = config.API_MAX_RETRIES
+        self.retry_base_delay = config.API_RETRY_BASE_DELAY
+        
+        # Connection pool settings
+        self.pool_connections = pool_connections or config.API_POOL_CONNECTIONS
+        self.pool_maxsize = pool_maxsize or config.API_POOL_MAXSIZE
+        self.max_idle = max_idle if max_idle is not None else config.API_POOL_MAX_IDLE
+        
+        # The session is created lazily so that each gunicorn worker builds its own
+        self._lock = threading.Lock()
+        self._session = None
+        self._session_pid = None
+        self._last_used = 0.0
+        self._sessions_created = 0
+        self._sessions_recycled = 0
+        self._retired_connections = 0
+        self._retired_requests = 0
+        
+        # Thread pool for concurrent backend reads, also created per worker
+        self.fanout_workers = config.API_FANOUT_WORKERS
+        self.fanout_timeout = config.API_FANOUT_TIMEOUT
+        self._executor = None
+        self._executor_pid = None
+        
+        # Read-through cache for user and payment data
+        self.cache = TTLCache(maxsize=config.API_CACHE_MAXSIZE, ttl=config.API_CACHE_TTL)
+        self._generations = {}  # key -> times invalidated, so a fetch started before a write is not stored
+        
+        # ETag / Last-Modified validators for conditional requests, with the last body
+        self.validators = TTLCache(maxsize=config.API_CACHE_MAXSIZE, ttl=config.API_VALIDATOR_TTL)
+        
+        # One circuit breaker per endpoint, created on first use
+        self._breakers = {}
+        
+        # Concurrent identical reads share one upstream request
+        self.flights = SingleFlight()
+        
+        # Per-endpoint latency, status and error metrics
+        self.metrics = metrics or registry
     
-    def register_user(self, username, pin, phone_number=None):
-        """Register a new user"""
-        try:
-            payload = {
-                'username': username,
-                'pin': pin
-            }
-            
-            if phone_number:
-                payload['phone_number'] = phone_number
+    def _new_session(self):
+        """Build a session with keep-alive connection pools for HTTP and HTTPS"""
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def _get_session(self):
+        """Return the pooled session, rebuilding it after a fork or a long idle period"""
+        now = time.monotonic()
+        with self._lock:
+            session = self._session
+            if session is not None and self._session_pid == os.getpid():
+                if now - self._last_used <= self.max_idle:
+                    self._last_used = now
+                    return session
+                
+                # Idle connections may have been dropped by the server, start fresh
+                opened, served = _pool_counts(session)
+                self._retired_connections += opened
+                self._retired_requests += served
+                self._sessions_recycled += 1
+                session.close()
             
-            response = requests.post(
-                f"{self.base_url}/users/register",
-                json=payload,
-                timeout=self.timeout
-            )
+            # A session inherited from the parent process shares its sockets, so it is
+            # discarded without being closed
+            self._session = self._new_session()
+            self._session_pid = os.getpid()
+            self._last_used = now
+            self._sessions_created += 1
+            return self._session
+    
+    def _get_breaker(self, endpoint):
+        """Return the circuit breaker for an endpoint"""
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(endpoint, CircuitBreaker(
+                    endpoint,
+                    failure_threshold=config.API_BREAKER_FAILURE_THRESHOLD,
+                    recovery_timeout=config.API_BREAKER_RECOVERY_TIMEOUT,
+                    half_open_max_calls=config.API_BREAKER_HALF_OPEN_CALLS
+                ))
+        return breaker
+    
+    def _timeouts(self):
+        """Return (connect, read) timeouts capped by the request deadline, or None if it has passed"""
+        remaining = deadline.remaining()
+        if remaining is None:
+            return self.connect_timeout, self.read_timeout
+        if remaining <= 0:
+            return None
+        return min(self.connect_timeout, remaining), min(self.read_timeout, remaining)
+    
+    def _retry_delay(self, attempt):
+        """Return the jittered backoff before a retry, or None if the deadline leaves no room"""
+        delay = random.uniform(0, self.retry_base_delay * (2 ** attempt))
+        remaining = deadline.remaining()
+        if remaining is not None and remaining <= delay + self.connect_timeout / 10:
+            return None
+        return delay
+    
+    def _request(self, endpoint, method, path, ok_statuses=(200,), raw_errors=False, retry=None,
+                 validator_key=None, **kwargs):
+        """Send a request over the pooled session and parse the response
+        
+        Calls to an endpoint whose circuit breaker is open fail immediately.
+        Connection errors, timeouts and 5xx responses count as failures,
+        and the breaker records one outcome per call, that of its last
+        attempt. GET requests (or any request with retry=True) are retried
+        after connection errors, timeouts and 502/503/504 responses while
+        the request deadline allows. With a validator_key the request is
+        made conditional on the last body stored under that key, which is
+        returned again on a 304.
+        """
+        if retry is None:
+            retry = method == 'GET'
+        validated = MISSING
+        if validator_key is not None:
+            validated = self.validators.get(validator_key)
+            if validated is not MISSING:
+                kwargs['headers'] = {**(kwargs.get('headers') or {}), **validated.request_headers()}
+        breaker = self._get_breaker(endpoint)
+        endpoint_metrics = self.metrics.endpoint(endpoint)
+        attempt = 0
+        failed = None  # Whether the last attempt failed, None before the first
+        
+        try:
+            while True:
+                timeouts = self._timeouts()
+                if timeouts is None:
+                    return False, "Request deadline exceeded"
+                if not breaker.allow():
+                    return False, "Service temporarily unavailable, please try again shortly"
+                
+                error = response = None
+                endpoint_metrics.start()
+                started = time.perf_counter()
+                try:
+                    response = self._get_session().request(
+                        method,
+                        f"{self.base_url}{path}",
+                        timeout=timeouts,
+                        **kwargs
+                    )
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    endpoint_metrics.finish(time.perf_counter() - started)
+                    error = e
+                except Exception as e:
+                    endpoint_metrics.finish(time.perf_counter() - started)
+                    failed = True
+                    return False, str(e)
+                else:
+                    endpoint_metrics.finish(
+                        time.perf_counter() - started,
+                        response.status_code,
+                        len(response.content)
+                    )
+                failed = error is not None or response.status_code >= 500
+                
+                retryable = error is not None or response.status_code in RETRY_STATUSES
+                if retry and retryable and attempt < self.max_retries:
+                    delay = self._retry_delay(attempt)
+                    if delay is not None:
+                        time.sleep(delay)
+                        attempt += 1
+                        continue
+                
+                if error is not None:
+                    return False, str(error)
+                try:
+                    if validator_key is not None:
+                        return self._revalidate(validator_key, validated, response, ok_statuses, raw_errors)
+                    return _parse_response(response, ok_statuses, raw_errors)
+                except Exception as e:
+                    return False, str(e)
+        finally:
+            if failed:
+                breaker.record_failure()
+            elif failed is not None:
+                breaker.record_success()
+    
+    def _revalidate(self, key, validated, response, ok_statuses, raw_errors):
+        """Handle the response to a conditional request"""
+        if response.status_code == 304 and validated is not MISSING:
+            return True, copy.deepcopy(validated.body)
+        
+        success, payload = _parse_response(response, ok_statuses, raw_errors)
+        if success:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag or last_modified:
+                self.validators.set(key, _Validated(etag, last_modified, copy.deepcopy(payload)))
+            else:
+                self.validators.pop(key)
+        return success, payload
+    
+    def breaker_states(self):
+        """Get the circuit breaker state of every endpoint called so far"""
+        return {name: breaker.snapshot() for name, breaker in list(self._breakers.items())}
+    
+    def pool_stats(self):
+        """Get connection pool usage for this worker"""
+        with self._lock:
+            opened, served = self._retired_connections, self._retired_requests
+            if self._session is not None and self._session_pid == os.getpid():
+                session_opened, session_served = _pool_counts(self._session)
+                opened += session_opened
+                served += session_served
             
-            if response.status_code == 201:
-                return True, response.json()
+            reused = max(served - opened, 0)
+            return {
+                'pid': os.getpid(),
+                'pool_maxsize': self.pool_maxsize,
+                'max_idle': self.max_idle,
+                'requests': served,
+                'connections_opened': opened,
+                'connections_reused': reused,
+                'reuse_ratio': round(reused / served, 4) if served else 0.0,
+                'sessions_created': self._sessions_created,
+                'sessions_recycled': self._sessions_recycled
+            }
+    
+    def _get_executor(self):
+        """Return the fan-out thread pool for this process"""
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.fanout_workers,
+                    thread_name_prefix='lipia-fanout'
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+    
+    def fan_out(self, calls, timeout=None, fallbacks=None):
+        """Run independent backend calls at the same time under one deadline
+        
+        calls maps a name to a tuple of (method, *args). The result maps each
+        name to the call's (success, payload) tuple. A call that fails or is
+        still running when the deadline passes gets (False, fallback()) if a
+        fallback is given for its name, otherwise (False, error message).
+        """
+        fallbacks = fallbacks or {}
+        timeout = self.fanout_timeout if timeout is None else timeout
+        remaining = deadline.remaining()
+        if remaining is not None:
+            timeout = min(timeout, remaining)
+        executor = self._get_executor()
+        
+        futures = {}
+        for name, (method, *args) in calls.items():
+            context = contextvars.copy_context()
+            futures[name] = executor.submit(context.run, method, *args)
+        wait(futures.values(), timeout=timeout)
+        
+        results = {}
+        for name, future in futures.items():
+            if not future.done():
+                future.cancel()
+                success, payload = False, "Request timed out"
+            elif future.exception() is not None:
+                success, payload = False, str(future.exception())
             else:
-                error_msg = response.json().get('error', 'Unknown error') if response.status_code < 500 else response.text
-                return False, error_msg
-        except Exception as e:
-            return False, str(e)
+                success, payload = future.result()
+            
+            if not success and name in fallbacks:
+                payload = fallbacks[name]()
+            results[name] = (success, payload)
+        return results
+    
+    def _shared_get(self, key, fetch):
+        """Run a read, joining an identical read already in flight"""
+        result, shared = self.flights.do(key, fetch)
+        if shared:
+            return copy.deepcopy(result)  # Callers may modify what they get back
+        return result
+    
+    def _cached_get(self, key, fetch):
+        """Serve a read from the cache, fetching and storing it on a miss"""
+        value = self.cache.get(key)
+        if value is not MISSING:
+            return True, copy.deepcopy(value)
+        
+        def fetch_and_store():
+            generation = self._generations.get(key, 0)
+            success, payload = fetch()
+            if success:
+                stored = copy.deepcopy(payload)
+                with self._lock:
+                    if self._generations.get(key, 0) == generation:
+                        self.cache.set(key, stored)
+            return success, payload
+        
+        return self._shared_get(key, fetch_and_store)
+    
+    def invalidate_user(self, username):
+        """Drop cached user and payment data after a write"""
+        for key in (('user', username), ('payments', username)):
+            with self._lock:
+                self._generations[key] = self._generations.get(key, 0) + 1
+                self.cache.pop(key)
+            self.flights.forget(key)
+    
+    def register_user(self, username, pin, phone_number=None):
+        """Register a new user"""
+        payload = {
+            'username': username,
+            'pin': pin
+        }
+        
+        if phone_number:
+            payload['phone_number'] = phone_number
+        
+        return self._request('register_user', 'POST', "/users/register", ok_statuses=(201,), json=payload)
     
     def login_user(self, username, pin):
         """Login a user"""
-        try:
-            payload = {
-                'username': username,
-                'pin': pin
-            }
-            
-            response = requests.post(
-                f"{self.base_url}/users/login",
-                json=payload,
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                return True, response.json()
-            else:
-                error_msg = response.json().get('error', 'Unknown error') if response.status_code < 500 else response.text
-                return False, error_msg
-        except Exception as e:
-            return False, str(e)
+        payload = {
+            'username': username,
+            'pin': pin
+        }
+        
+        return self._request('login_user', 'POST', "/users/login", json=payload)
     
     def get_user(self, username):
         """Get user data"""
-        try:
-            response = requests.get(
-                f"{self.base_url}/users/{username}",
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                return True, response.json()
-            else:
-                error_msg = response.json().get('error', 'Unknown error') if response.status_code < 500 else response.text
-                return False, error_msg
-        except Exception as e:
-            return False, str(e)
+        return self._cached_get(
+            ('user', username),
+            lambda: self._request('get_user', 'GET', f"/users/{username}")
+        )
     
-    def get_user_payments(self, username):
-        """Get user payments"""
-        try:
-            response = requests.get(
-                f"{self.base_url}/users/{username}/payments",
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                return True, response.json()
-            else:
-                error_msg = response.json().get('error', 'Unknown error') if response.status_code < 500 else response.text
-                return False, error_msg
-        except Exception as e:
-            return False, str(e)
+    def get_user_payments(self, username, transform=None):
+        """Get user payments
+        
+        The list is fetched with a conditional request, so an unchanged history
+        is not downloaded again. A transform (e.g. formatting rows for display)
+        is kept next to the stored list and only rerun when the list changes;
+        treat its result as read-only.
+        """
+        key = ('payments', username)
+        success, payments = self._cached_get(
+            key,
+            lambda: self._request('get_user_payments', 'GET', f"/users/{username}/payments", validator_key=key)
+        )
+        return self._transformed(key, success, payments, transform)
     
-    def initiate_payment(self, username, phone, plan_type='basic'):
-        """Initiate a payment"""
-        try:
-            payload = {
-                'username': username,
-                'phone': phone,
-                'plan_type': plan_type
-            }
-            
-            response = requests.post(
-                f"{self.base_url}/payments/initiate",
-                json=payload,
-                timeout=self.timeout
-            )
-            
-            if response.status_code in [200, 202]:
-                return True, response.json()
-            else:
-                error_msg = response.json().get('error', 'Unknown error') if response.status_code < 500 else response.text
-                return False, error_msg
-        except Exception as e:
-            return False, str(e)
+    def get_user_payments_page(self, username, page=1, page_size=None, transform=None):
+        """Get one page of user payments, conditionally like get_user_payments"""
+        page_size = page_size or config.PAYMENTS_PAGE_SIZE
+        key = ('payments', username, page, page_size)
+        success, payments = self._request(
+            'get_user_payments', 'GET', f"/users/{username}/payments",
+            validator_key=key, params={'page': page, 'per_page': page_size}
+        )
+        return self._transformed(key, success, payments, transform)
+    
+    def iter_user_payments(self, username, page_size=None, transform=None, start_page=1, previous=None):
+        """Iterate over user payments one page at a time
+        
+        Yields (success, page) tuples and only requests a page when the
+        iterator reaches it, so memory is bounded by the page size. Stops
+        after a failed page or one shorter than page_size. A backend that
+        ignores paging returns either a longer page, which is yielded as the
+        last, or the same rows again, which ends the iteration without being
+        yielded. previous is the page before start_page, if already fetched.
+        """
+        page_size = page_size or config.PAYMENTS_PAGE_SIZE
+        page = start_page
+        while True:
+            success, payments = self.get_user_payments_page(username, page, page_size, transform)
+            if success and _repeats_page(payments, previous):
+                return
+            yield success, payments
+            if not success or not isinstance(payments, list) or len(payments) != page_size:
+                return
+            previous = payments
+            page += 1
+    
+    def _transformed(self, key, success, payload, transform):
+        """Apply a transform, reusing the result kept with the stored body"""
+        if not success or transform is None:
+            return success, payload
+        
+        validated = self.validators.get(key)
+        if validated is MISSING:
+            return True, transform(payload)  # No validators, nothing to keep it next to
+        return True, validated.derive(transform)
+    
+    def initiate_payment(self, username, phone, plan_type='basic', idempotency_key=None):
+        """Initiate a payment
+        
+        The request is only retried when an idempotency key is given, so that
+        the backend can recognise a repeated attempt.
+        """
+        payload = {
+            'username': username,
+            'phone': phone,
+            'plan_type': plan_type
+        }
+        headers = {'Idempotency-Key': idempotency_key} if idempotency_key else None
+        
+        result = self._request(
+            'initiate_payment', 'POST', "/payments/initiate",
+            ok_statuses=(200, 202), retry=bool(idempotency_key), json=payload, headers=headers
+        )
+        self.invalidate_user(username)
+        return result
     
     def get_payment_status(self, checkout_id):
         """Get payment status"""
-        try:
-            response = requests.get(
-                f"{self.base_url}/payments/{checkout_id}/status",
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                return True, response.json()
-            else:
-                error_msg = response.json().get('error', 'Unknown error') if response.status_code < 500 else response.text
-                return False, error_msg
-        except Exception as e:
-            return False, str(e)
+        return self._shared_get(
+            ('payment_status', checkout_id),
+            lambda: self._request('get_payment_status', 'GET', f"/payments/{checkout_id}/status")
+        )
     
     def consume_words(self, username, words):
         """Consume words from a user's account"""
-        try:
-            payload = {
-                'username': username,
-                'words': words
-            }
-            
-            response = requests.post(
-                f"{self.base_url}/words/consume",
-                json=payload,
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                return True, response.json()
-            else:
-                error_msg = response.json().get('error', 'Unknown error') if response.status_code < 500 else response.text
-                return False, error_msg
-        except Exception as e:
-            return False, str(e)
+        payload = {
+            'username': username,
+            'words': words
+        }
+        
+        result = self._request('consume_words', 'POST', "/words/consume", json=payload)
+        self.invalidate_user(username)
+        return result
     
     def health_check(self):
         """Check API health"""
-        try:
-            response = requests.get(
-                f"{self.base_url}/health",
-                timeout=self.timeout
-            )
-            
-            if response.status_code == 200:
-                return True, response.json()
-            else:
-                return False, response.text
-        except Exception as e:
-            return False, str(e)
+        return self._request('health_check', 'GET', "/health", raw_errors=True)
 
 # Create a client instance
 api_client = LipiaClient()
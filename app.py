@@ -1,4 +1,4 @@
-from flask import Flask, render_template_string, request, redirect, url_for, session, flash, jsonify
+from flask import Flask, request, redirect, url_for, session, flash, jsonify, g
 import random
 import string
 import datetime
@@ -8,10 +8,19 @@ import sys
 from functools import wraps
 
 import config
-from models import users_db, transactions_db, create_user_session, get_user_data, user_exists, add_transaction
-from utils import humanize_text, detect_ai_content, register_user_to_backend, generate_transaction_id, format_date
-from templates import html_templates
+import deadline
+import tokenizer
+from records import User, Transaction
+from models import users_db, transactions_db, create_user_session, get_user_data, user_exists, add_transaction, get_user_transactions
+from utils import humanize_text, word_limit, detect_ai_content, register_user_to_backend, generate_transaction_id, format_payments, PaymentHistory
+from template_registry import template_registry
+from page_cache import page_cache
+from asset_pipeline import asset_pipeline
+from result_cache import result_cache
 from api_client import api_client
+from ledger import quota_ledger
+from poller import payment_poller
+from metrics import registry as metrics_registry
 
 # Debug print statements for deployment troubleshooting
 print("Python version:", sys.version)
@@ -21,6 +30,23 @@ print("Environment variables:", {k: v for k, v in os.environ.items() if not k.st
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', config.SECRET_KEY)
+template_registry.init_app(app)
+asset_pipeline.init_app(app)
+
+# Poll the payments left Pending from before this worker started
+payment_poller.start()
+
+# Every backend call made while serving a request shares one time budget
+@app.before_request
+def start_request_deadline():
+    g.deadline_token = deadline.start(config.API_REQUEST_BUDGET)
+
+
+@app.teardown_request
+def reset_request_deadline(exc=None):
+    token = g.pop('deadline_token', None)
+    if token is not None:
+        deadline.reset(token)
 
 # Login decorator
 def login_required(f):
@@ -32,13 +58,34 @@ def login_required(f):
 
     return decorated_function
 
+
+def load_user_data(username):
+    """Get a user from session storage, fetching it again from the API after eviction"""
+    user_data = get_user_data(username)
+    if user_data is None:
+        success, response = api_client.get_user(username)
+        if success:
+            user_data = response
+            quota_ledger.sync(username, user_data)  # Account for words not yet reported
+            create_user_session(username, user_data)
+    return user_data
+
+
+def session_expired():
+    """Send a user whose data can no longer be loaded back to the login page"""
+    session.pop('user_id', None)
+    flash('Your session has expired. Please login again.', 'error')
+    return redirect(url_for('login'))
+
 # Routes
 @app.route('/')
+@page_cache.cached
 def index():
-    return render_template_string(html_templates['index.html'], pricing_plans=config.pricing_plans, title="Home")
+    return template_registry.render('index.html', pricing_plans=config.pricing_plans, title="Home")
 
 
 @app.route('/login', methods=['GET', 'POST'])
+@page_cache.cached
 def login():
     if request.method == 'POST':
         username = request.form['username']
@@ -60,10 +107,11 @@ def login():
             error_msg = response if isinstance(response, str) else "Invalid credentials"
             flash(error_msg, 'error')
 
-    return render_template_string(html_templates['login.html'], title="Login")
+    return template_registry.render('login.html', title="Login")
 
 
 @app.route('/register', methods=['GET', 'POST'])
+@page_cache.cached
 def register():
     if request.method == 'POST':
         username = request.form['username']
@@ -75,21 +123,21 @@ def register():
         # Validate PIN (4 digits)
         if not password.isdigit() or len(password) != 4:
             flash('PIN must be 4 digits', 'error')
-            return render_template_string(html_templates['register.html'], pricing_plans=config.pricing_plans, title="Register")
+            return template_registry.render('register.html', pricing_plans=config.pricing_plans, title="Register")
             
         # Register with the API
         success, response = api_client.register_user(username, password, phone)
         
         if success:
             # Create a session for the user
-            user_data = {
-                'username': username,
-                'words_remaining': 0,
-                'phone_number': phone,
-                'plan': plan_type,
-                'payment_status': 'Pending' if plan_type != 'Free' else 'Paid',
-                'created_at': datetime.datetime.now().strftime('%Y-%m-%d')
-            }
+            user_data = User(
+                username=username,
+                words_remaining=0,
+                phone_number=phone,
+                plan=plan_type,
+                payment_status='Pending' if plan_type != 'Free' else 'Paid',
+                created_at=datetime.datetime.now().strftime('%Y-%m-%d')
+            )
             create_user_session(username, user_data)
             
             # Register with backend API
@@ -101,7 +149,7 @@ def register():
             error_msg = response if isinstance(response, str) else "Registration failed"
             flash(error_msg, 'error')
 
-    return render_template_string(html_templates['register.html'], pricing_plans=config.pricing_plans, title="Register")
+    return template_registry.render('register.html', pricing_plans=config.pricing_plans, title="Register")
 
 
 @app.route('/dashboard')
@@ -114,12 +162,15 @@ def dashboard():
     
     if success:
         user_data = response
+        quota_ledger.sync(username, user_data)  # Account for words not yet reported
         create_user_session(username, user_data)  # Update session storage
     else:
         user_data = get_user_data(username)  # Fallback to session storage
+        if user_data is None:
+            return session_expired()
     
-    return render_template_string(
-        html_templates['dashboard.html'], 
+    return template_registry.render(
+        'dashboard.html', 
         user=user_data,
         plan=config.pricing_plans[user_data.get('plan', 'Free')],
         title="Dashboard"
@@ -132,7 +183,9 @@ def humanize():
     message = ""
     humanized_text = ""
     username = session['user_id']
-    user_data = get_user_data(username)
+    user_data = load_user_data(username)
+    if user_data is None:
+        return session_expired()
     
     payment_required = user_data.get('payment_status') == 'Pending' and user_data.get('plan') != 'Free'
 
@@ -142,29 +195,26 @@ def humanize():
 
         # Only process if payment not required or on Free plan
         if not payment_required:
-            word_count = len(original_text.split())
+            # One scan counts the words and finds where the plan limit cuts the text
+            tokens = tokenizer.scan(original_text, word_limit(user_type))
             
-            # Consume words from the user's account
-            success, response = api_client.consume_words(username, word_count)
+            # Check and deduct words locally, the ledger reports them to the API in batches
+            success, response = quota_ledger.consume(username, tokens.count, user_data, tokens.truncated)
             
             if success:
                 # Process the text
-                humanized_text, message = humanize_text(original_text, user_type)
+                humanized_text, message = humanize_text(original_text, user_type, tokens)
                 
-                # Refresh user data after consumption
-                success, user_response = api_client.get_user(username)
-                if success:
-                    create_user_session(username, user_response)
+                # Keep the session balance in step with the ledger
+                user_data['words_remaining'] = quota_ledger.balance(username)
+                create_user_session(username, user_data)
             else:
-                if isinstance(response, dict) and 'error' in response:
-                    message = response['error']
-                else:
-                    message = "Failed to process: Insufficient words"
+                message = response
         else:
             message = "Payment required to access this feature. Please upgrade your plan."
 
-    return render_template_string(
-        html_templates['humanize.html'],
+    return template_registry.stream(
+        'humanize.html',
         message=message,
         humanized_text=humanized_text,
         payment_required=payment_required,
@@ -179,7 +229,9 @@ def detect():
     result = None
     message = ""
     username = session['user_id']
-    user_data = get_user_data(username)
+    user_data = load_user_data(username)
+    if user_data is None:
+        return session_expired()
     
     payment_required = user_data.get('payment_status') == 'Pending' and user_data.get('plan') != 'Free'
 
@@ -193,8 +245,8 @@ def detect():
         else:
             message = "Payment required to access this feature. Please upgrade your plan."
 
-    return render_template_string(
-        html_templates['detect.html'],
+    return template_registry.render(
+        'detect.html',
         result=result,
         message=message,
         payment_required=payment_required,
@@ -207,40 +259,65 @@ def detect():
 def account():
     username = session['user_id']
     
-    # Get fresh user data and payments from API
-    success, user_response = api_client.get_user(username)
-    payments_success, payments_response = api_client.get_user_payments(username)
+    # Get fresh user data and the first page of payments from API at the same time
+    page_size = config.PAYMENTS_PAGE_SIZE
+    results = api_client.fan_out(
+        {
+            'user': (api_client.get_user, username),
+            'payments': (api_client.get_user_payments_page, username, 1, page_size, format_payments)
+        },
+        fallbacks={'user': lambda: get_user_data(username)}  # Fallback to session storage
+    )
     
+    success, user_data = results['user']
     if success:
-        user_data = user_response
+        quota_ledger.sync(username, user_data)  # Account for words not yet reported
         create_user_session(username, user_data)  # Update session storage
-    else:
-        user_data = get_user_data(username)  # Fallback to session storage
+    elif user_data is None:
+        return session_expired()
     
-    # Format transactions for display
-    user_transactions = []
+    # Stream the payment history, later pages are fetched while the rows are written out
+    payments_success, payments_response = results['payments']
     if payments_success and isinstance(payments_response, list):
-        for payment in payments_response:
-            payment['date'] = format_date(payment.get('timestamp', ''))
-            user_transactions.append(payment)
+        history = PaymentHistory(username, payments_response, page_size, config.PAYMENTS_STREAM_PAGES)
     else:
-        # Fallback to session storage
-        user_transactions = [t for t in transactions_db if t.get('user_id') == username]
+        # Fallback to session storage, which holds the whole history
+        history = PaymentHistory(username, get_user_transactions(username))
     
-    return render_template_string(
-        html_templates['account.html'], 
+    return template_registry.stream(
+        'account.html', 
         user=user_data, 
         plan=config.pricing_plans[user_data.get('plan', 'Free')],
-        transactions=user_transactions,
+        transactions=history,
         title="Account"
     )
 
 
+@app.route('/account/payments')
+@login_required
+def account_payments():
+    """Render one more page of payment history rows for the account page"""
+    username = session['user_id']
+    page = max(request.args.get('page', 2, type=int), 1)
+    page_size = config.PAYMENTS_PAGE_SIZE
+    
+    success, payments = api_client.get_user_payments_page(username, page, page_size, format_payments)
+    if not success or not isinstance(payments, list):
+        return jsonify({'error': payments if isinstance(payments, str) else "Failed to load payments"}), 502
+    
+    headers = {}
+    if len(payments) == page_size:
+        headers['X-Next-Page'] = str(page + 1)
+    return template_registry.render('payment_rows.html', transactions=payments), 200, headers
+
+
 @app.route('/payment', methods=['GET', 'POST'])
 @login_required
 def payment():
     username = session['user_id']
-    user_data = get_user_data(username)
+    user_data = load_user_data(username)
+    if user_data is None:
+        return session_expired()
     
     if request.method == 'POST':
         phone_number = request.form['phone_number']
@@ -253,17 +330,19 @@ def payment():
             # Record the transaction in session
             transaction_id = response.get('checkout_id', generate_transaction_id())
             
-            transaction_data = {
-                'transaction_id': transaction_id,
-                'user_id': username,
-                'phone_number': phone_number,
-                'amount': config.pricing_plans[plan_type]['price'],
-                'subscription_type': plan_type,
-                'date': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'status': 'Completed' if response.get('status') == 'completed' else 'Pending',
-                'reference': response.get('reference', 'N/A')
-            }
+            transaction_data = Transaction(
+                transaction_id=transaction_id,
+                user_id=username,
+                phone_number=phone_number,
+                amount=config.pricing_plans[plan_type]['price'],
+                subscription_type=plan_type,
+                date=datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                status='Completed' if response.get('status') == 'completed' else 'Pending',
+                reference=response.get('reference', 'N/A')
+            )
             add_transaction(transaction_data)
+            if transaction_data['status'] == 'Pending':
+                payment_poller.track(transaction_id)  # Poll the API until the payment settles
             
             # Update user payment status
             user_data['payment_status'] = 'Paid' if response.get('status') == 'completed' else 'Pending'
@@ -280,8 +359,8 @@ def payment():
             error_msg = response if isinstance(response, str) else "Payment failed"
             flash(error_msg, 'error')
 
-    return render_template_string(
-        html_templates['payment.html'],
+    return template_registry.render(
+        'payment.html',
         plan=config.pricing_plans[user_data.get('plan', 'Free')],
         title="Make Payment"
     )
@@ -291,7 +370,9 @@ def payment():
 @login_required
 def upgrade():
     username = session['user_id']
-    user_data = get_user_data(username)
+    user_data = load_user_data(username)
+    if user_data is None:
+        return session_expired()
     current_plan = user_data.get('plan', 'Free')
     
     if request.method == 'POST':
@@ -301,6 +382,7 @@ def upgrade():
         user_data['plan'] = new_plan
         user_data['payment_status'] = 'Pending'
         create_user_session(username, user_data)
+        api_client.invalidate_user(username)
         
         flash(f'Your plan has been upgraded to {new_plan}. Please make payment to activate.', 'success')
         return redirect(url_for('payment'))
@@ -308,8 +390,8 @@ def upgrade():
     # Filter available plans (exclude current plan)
     available_plans = {k: v for k, v in config.pricing_plans.items() if k != current_plan}
     
-    return render_template_string(
-        html_templates['upgrade.html'], 
+    return template_registry.render(
+        'upgrade.html', 
         current_plan={'name': current_plan, **config.pricing_plans[current_plan]},
         available_plans=available_plans,
         title="Upgrade Plan"
@@ -318,7 +400,9 @@ def upgrade():
 
 @app.route('/logout')
 def logout():
-    session.pop('user_id', None)
+    username = session.pop('user_id', None)
+    if username:
+        quota_ledger.forget(username)  # Report any words still pending
     flash('You have been logged out', 'info')
     return redirect(url_for('index'))
 
@@ -331,611 +415,31 @@ def api_health():
     
     return jsonify({
         'api_status': 'online' if success else 'offline',
-        'details': response if success else str(response)
+        'details': response if success else str(response),
+        'circuit_breakers': api_client.breaker_states()
     })
 
 
-# CSS styles
+# Backend client metrics
+@app.route('/metrics')
+def metrics():
+    """Report per-endpoint backend metrics"""
+    return jsonify({
+        'endpoints': metrics_registry.snapshot(),
+        'connection_pool': api_client.pool_stats(),
+        'result_cache': result_cache.stats()
+    })
+
+
+# Unhashed asset URLs, kept for clients still holding the old links
 @app.route('/static/style.css')
 def serve_css():
-    css = """
-    /* Reset and base styles */
-    * {
-        margin: 0;
-        padding: 0;
-        box-sizing: border-box;
-    }
-    
-    body {
-        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-        line-height: 1.6;
-        color: #333;
-        background-color: #f9f9f9;
-    }
-    
-    a {
-        color: #0066cc;
-        text-decoration: none;
-    }
-    
-    a:hover {
-        text-decoration: underline;
-    }
-    
-    /* Layout */
-    .container {
-        max-width: 1200px;
-        margin: 0 auto;
-        padding: 20px;
-    }
-    
-    header {
-        background-color: #fff;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-    }
-    
-    .header-container {
-        display: flex;
-        justify-content: space-between;
-        align-items: center;
-        max-width: 1200px;
-        margin: 0 auto;
-        padding: 20px;
-    }
-    
-    .logo a {
-        font-size: 1.5rem;
-        font-weight: bold;
-        color: #333;
-    }
-    
-    nav ul {
-        display: flex;
-        list-style: none;
-    }
-    
-    nav ul li {
-        margin-left: 20px;
-    }
-    
-    main {
-        min-height: calc(100vh - 160px);
-        padding: 40px 0;
-    }
-    
-    footer {
-        background-color: #333;
-        color: #fff;
-        padding: 20px 0;
-        text-align: center;
-    }
-    
-    /* Form styles */
-    .form-group {
-        margin-bottom: 20px;
-    }
-    
-    label {
-        display: block;
-        margin-bottom: 5px;
-        font-weight: 600;
-    }
-    
-    input, select, textarea {
-        width: 100%;
-        padding: 10px;
-        border: 1px solid #ddd;
-        border-radius: 4px;
-        font-size: 1rem;
-    }
-    
-    textarea {
-        min-height: 150px;
-        resize: vertical;
-    }
-    
-    .form-actions {
-        margin-top: 30px;
-    }
-    
-    /* Button styles */
-    .button {
-        display: inline-block;
-        padding: 10px 20px;
-        background-color: #0066cc;
-        color: #fff;
-        border: none;
-        border-radius: 4px;
-        cursor: pointer;
-        font-size: 1rem;
-        text-align: center;
-    }
-    
-    .button:hover {
-        background-color: #0052a3;
-        text-decoration: none;
-    }
-    
-    .button.primary {
-        background-color: #0066cc;
-    }
-    
-    .button.secondary {
-        background-color: #666;
-    }
-    
-    /* Flash messages */
-    .flash-messages {
-        margin-bottom: 20px;
-    }
-    
-    .flash {
-        padding: 10px 15px;
-        margin-bottom: 10px;
-        border-radius: 4px;
-    }
-    
-    .flash.success {
-        background-color: #dff0d8;
-        color: #3c763d;
-        border: 1px solid #d6e9c6;
-    }
-    
-    .flash.error {
-        background-color: #f2dede;
-        color: #a94442;
-        border: 1px solid #ebccd1;
-    }
-    
-    .flash.info {
-        background-color: #d9edf7;
-        color: #31708f;
-        border: 1px solid #bce8f1;
-    }
-    
-    .flash.warning {
-        background-color: #fcf8e3;
-        color: #8a6d3b;
-        border: 1px solid #faebcc;
-    }
-    
-    /* Hero section */
-    .hero {
-        text-align: center;
-        padding: 60px 0;
-    }
-    
-    .hero h1 {
-        font-size: 2.5rem;
-        margin-bottom: 20px;
-    }
-    
-    .hero p {
-        font-size: 1.2rem;
-        margin-bottom: 30px;
-    }
-    
-    .cta-buttons {
-        display: flex;
-        justify-content: center;
-        gap: 20px;
-    }
-    
-    /* Features section */
-    .features {
-        padding: 60px 0;
-        background-color: #fff;
-    }
-    
-    .features h2 {
-        text-align: center;
-        margin-bottom: 40px;
-    }
-    
-    .feature-list {
-        display: flex;
-        gap: 30px;
-    }
-    
-    .feature {
-        flex: 1;
-        padding: 20px;
-        border-radius: 4px;
-        background-color: #f9f9f9;
-        text-align: center;
-    }
-    
-    .feature h3 {
-        margin-bottom: 15px;
-    }
-    
-    /* Pricing section */
-    .pricing {
-        padding: 60px 0;
-    }
-    
-    .pricing h2 {
-        text-align: center;
-        margin-bottom: 40px;
-    }
-    
-    .pricing-cards {
-        display: flex;
-        gap: 30px;
-        justify-content: center;
-    }
-    
-    .pricing-card {
-        flex: 1;
-        max-width: 300px;
-        padding: 30px;
-        border-radius: 4px;
-        background-color: #fff;
-        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
-        text-align: center;
-    }
-    
-    .pricing-card h3 {
-        margin-bottom: 15px;
-    }
-    
-    .pricing-card .price {
-        font-size: 2rem;
-        font-weight: bold;
-        margin-bottom: 20px;
-    }
-    
-    .pricing-card ul {
-        margin-bottom: 30px;
-        list-style: none;
-    }
-    
-    .pricing-card ul li {
-        margin-bottom: 10px;
-    }
-    
-    /* Auth forms */
-    .auth-form {
-        max-width: 500px;
-        margin: 0 auto;
-        padding: 30px;
-        background-color: #fff;
-        border-radius: 4px;
-        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
-    }
-    
-    .auth-form h1 {
-        margin-bottom: 30px;
-        text-align: center;
-    }
-    
-    .auth-form p {
-        text-align: center;
-        margin-top: 20px;
-    }
-    
-    /* Dashboard */
-    .dashboard h1 {
-        margin-bottom: 30px;
-    }
-    
-    .dashboard-cards {
-        display: flex;
-        gap: 30px;
-        margin-bottom: 40px;
-    }
-    
-    .dashboard-card {
-        flex: 1;
-        padding: 30px;
-        background-color: #fff;
-        border-radius: 4px;
-        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
-    }
-    
-    .dashboard-card h2 {
-        margin-bottom: 20px;
-    }
-    
-    .big-number {
-        font-size: 3rem;
-        font-weight: bold;
-        margin-bottom: 20px;
-        color: #0066cc;
-    }
-    
-    .action-links {
-        display: flex;
-        flex-direction: column;
-        gap: 10px;
-    }
-    
-    .action-link {
-        padding: 10px;
-        background-color: #f9f9f9;
-        border-radius: 4px;
-        text-align: center;
-    }
-    
-    /* Tool pages */
-    .tool-page {
-        max-width: 800px;
-        margin: 0 auto;
-    }
-    
-    .tool-page h1 {
-        margin-bottom: 30px;
-    }
-    
-    .tool-page p {
-        margin-bottom: 20px;
-    }
-    
-    .result-message {
-        margin: 30px 0;
-        padding: 15px;
-        background-color: #f9f9f9;
-        border-radius: 4px;
-    }
-    
-    .result-box {
-        margin-top: 30px;
-        padding: 20px;
-        background-color: #fff;
-        border-radius: 4px;
-        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
-    }
-    
-    .result-box h2 {
-        margin-bottom: 20px;
-    }
-    
-    .result-content {
-        margin-bottom: 20px;
-        padding: 15px;
-        background-color: #f9f9f9;
-        border-radius: 4px;
-        white-space: pre-wrap;
-    }
-    
-    /* Score display */
-    .score-display {
-        margin: 20px 0;
-    }
-    
-    .score-bar {
-        height: 40px;
-        border-radius: 4px;
-        overflow: hidden;
-        display: flex;
-    }
-    
-    .score-fill {
-        height: 100%;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        color: #fff;
-        font-weight: bold;
-    }
-    
-    .score-fill.human {
-        background-color: #0066cc;
-    }
-    
-    .score-fill.ai {
-        background-color: #cc0000;
-    }
-    
-    /* Account page */
-    .account-page h1, .account-page h2 {
-        margin-bottom: 30px;
-    }
-    
-    .account-info {
-        margin-bottom: 40px;
-    }
-    
-    .info-card {
-        padding: 30px;
-        background-color: #fff;
-        border-radius: 4px;
-        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
-    }
-    
-    .info-card p {
-        margin-bottom: 15px;
-    }
-    
-    .account-actions {
-        display: flex;
-        gap: 20px;
-        margin-bottom: 40px;
-    }
-    
-    /* Payment-required message */
-    .payment-required {
-        padding: 30px;
-        background-color: #f9f9f9;
-        border-radius: 4px;
-        text-align: center;
-        margin-bottom: 30px;
-    }
-    
-    .payment-required p {
-        margin-bottom: 20px;
-    }
-    
-    /* Status indicators */
-    .status {
-        display: inline-block;
-        padding: 3px 8px;
-        border-radius: 4px;
-        font-size: 0.9rem;
-    }
-    
-    .status.success {
-        background-color: #dff0d8;
-        color: #3c763d;
-    }
-    
-    .status.warning {
-        background-color: #fcf8e3;
-        color: #8a6d3b;
-    }
-    
-    /* Tables */
-    .table-container {
-        overflow-x: auto;
-    }
-    
-    .data-table {
-        width: 100%;
-        border-collapse: collapse;
-    }
-    
-    .data-table th, .data-table td {
-        padding: 10px;
-        text-align: left;
-        border-bottom: 1px solid #ddd;
-    }
-    
-    .data-table th {
-        background-color: #f9f9f9;
-        font-weight: 600;
-    }
-    
-    /* Payment page */
-    .payment-page, .upgrade-page {
-        max-width: 600px;
-        margin: 0 auto;
-    }
-    
-    .plan-details {
-        margin-bottom: 30px;
-        padding: 20px;
-        background-color: #f9f9f9;
-        border-radius: 4px;
-    }
-    
-    /* Plan selection */
-    .current-plan {
-        margin-bottom: 40px;
-    }
-    
-    .plan-options {
-        display: flex;
-        gap: 20px;
-        margin-bottom: 30px;
-    }
-    
-    .plan-option {
-        flex: 1;
-    }
-    
-    .plan-option input[type="radio"] {
-        display: none;
-    }
-    
-    .plan-option label {
-        display: block;
-        cursor: pointer;
-    }
-    
-    .plan-card {
-        padding: 20px;
-        background-color: #fff;
-        border-radius: 4px;
-        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
-        text-align: center;
-        transition: transform 0.2s;
-    }
-    
-    .plan-card.current {
-        border: 2px solid #0066cc;
-    }
-    
-    .plan-option input[type="radio"]:checked + label .plan-card {
-        border: 2px solid #0066cc;
-        transform: scale(1.05);
-    }
-    
-    /* Analysis details */
-    .analysis-details {
-        margin-top: 20px;
-    }
-    
-    .analysis-details h3 {
-        margin-bottom: 15px;
-    }
-    
-    .analysis-details ul {
-        list-style: none;
-    }
-    
-    .analysis-details ul li {
-        margin-bottom: 10px;
-    }
-    
-    /* Media queries */
-    @media (max-width: 768px) {
-        .header-container {
-            flex-direction: column;
-            padding: 10px;
-        }
-        
-        .logo {
-            margin-bottom: 10px;
-        }
-        
-        nav ul {
-            flex-wrap: wrap;
-            justify-content: center;
-        }
-        
-        nav ul li {
-            margin: 5px;
-        }
-        
-        .feature-list, .dashboard-cards, .pricing-cards {
-            flex-direction: column;
-        }
-        
-        .pricing-card {
-            max-width: 100%;
-        }
-        
-        .plan-options {
-            flex-direction: column;
-        }
-    }
-    """
-    return css, 200, {'Content-Type': 'text/css'}
+    return asset_pipeline.serve('style.css')
 
 
-# JavaScript
 @app.route('/static/script.js')
 def serve_js():
-    js = """
-    // Notification close
-    document.addEventListener('DOMContentLoaded', function() {
-        // Add close button to flash messages
-        const flashMessages = document.querySelectorAll('.flash');
-        flashMessages.forEach(function(message) {
-            const closeButton = document.createElement('span');
-            closeButton.innerHTML = '&times;';
-            closeButton.className = 'close-button';
-            closeButton.style.float = 'right';
-            closeButton.style.cursor = 'pointer';
-            closeButton.style.marginLeft = '10px';
-            closeButton.onclick = function() {
-                message.style.display = 'none';
-            };
-            message.appendChild(closeButton);
-        });
-    });
-    """
-    return js, 200, {'Content-Type': 'text/javascript'}
+    return asset_pipeline.serve('script.js')
 
 # Debug route
 @app.route('/debug')
@@ -946,38 +450,46 @@ def debug():
         "Current directory": os.getcwd(),
         "Directory contents": os.listdir('.'),
         "Environment variables": {k: v for k, v in os.environ.items() if not k.startswith('_')},
-        "Templates": list(html_templates.keys()),
+        "Templates": template_registry.stats(),
         "Config": {
             "APP_NAME": config.APP_NAME,
             "API_URL": config.API_URL,
             "DEBUG": config.DEBUG,
             "PORT": config.PORT
-        }
+        },
+        "API cache": api_client.cache.stats(),
+        "Page cache": page_cache.stats(),
+        "Result cache": result_cache.stats(),
+        "Assets": asset_pipeline.stats(),
+        "API single-flight": api_client.flights.stats(),
+        "Quota ledger": quota_ledger.stats(),
+        "Payment poller": payment_poller.stats(),
+        "User store": users_db.stats()
     }
     return jsonify(debug_info)
 
 if __name__ == '__main__':
     # Create a demo user for testing
-    create_user_session('demo', {
-        'username': 'demo',
-        'words_remaining': 500,
-        'phone_number': '0712345678',
-        'plan': 'Basic',
-        'payment_status': 'Paid',
-        'created_at': datetime.datetime.now().strftime('%Y-%m-%d')
-    })
+    create_user_session('demo', User(
+        username='demo',
+        words_remaining=500,
+        phone_number='0712345678',
+        plan='Basic',
+        payment_status='Paid',
+        created_at=datetime.datetime.now().strftime('%Y-%m-%d')
+    ))
     
     # Create a demo transaction
-    demo_transaction = {
-        'transaction_id': 'TXND3M0123456',
-        'user_id': 'demo',
-        'phone_number': '0712345678',
-        'amount': config.pricing_plans['Basic']['price'],
-        'subscription_type': 'Basic',
-        'date': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        'status': 'Completed',
-        'reference': 'REF123456'
-    }
+    demo_transaction = Transaction(
+        transaction_id='TXND3M0123456',
+        user_id='demo',
+        phone_number='0712345678',
+        amount=config.pricing_plans['Basic']['price'],
+        subscription_type='Basic',
+        date=datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        status='Completed',
+        reference='REF123456'
+    )
     add_transaction(demo_transaction)
     
     # Start the Flask app
@@ -0,0 +1,135 @@
+import gzip
+import hashlib
+
+from flask import abort, make_response, request
+
+import config
+from static_assets import assets
+
+try:
+    import brotli
+except ImportError:  # Optional, gzip is always available
+    brotli = None
+
+# Content types by file extension
+CONTENT_TYPES = {
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'text/javascript; charset=utf-8'
+}
+
+# A year, the longest lifetime caches are expected to honour
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class _Asset:
+    """One built asset and its precompressed variants"""
+    
+    __slots__ = ('name', 'hashed_name', 'content_type', 'digest', 'variants')
+    
+    def __init__(self, name, source, gzip_level=9, brotli_quality=11):
+        self.name = name
+        body = source.encode('utf-8')
+        self.digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+        stem, dot, extension = name.rpartition('.')
+        self.hashed_name = f"{stem}.{self.digest}.{extension}" if dot else f"{name}.{self.digest}"
+        self.content_type = CONTENT_TYPES.get('.' + extension, 'application/octet-stream')
+        
+        # encoding -> body, only kept when smaller than the original
+        self.variants = {'identity': body}
+        compressed = gzip.compress(body, gzip_level, mtime=0)
+        if len(compressed) < len(body):
+            self.variants['gzip'] = compressed
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=brotli_quality)
+            if len(compressed) < len(body):
+                self.variants['br'] = compressed
+    
+    def negotiate(self, accept_encodings):
+        """Pick the smallest variant the client accepts"""
+        best = 'identity'
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accept_encodings[encoding] > 0:
+                if len(self.variants[encoding]) < len(self.variants[best]):
+                    best = encoding
+        return best
+
+
+class AssetPipeline:
+    """Builds the static assets once and serves them with long-lived caching
+    
+    Every asset is hashed and precompressed with gzip, and with brotli when
+    the brotli package is installed, when the app is created. It is served
+    at /assets/<name>.<hash>.<ext>: url_for('asset', filename='style.css')
+    fills in the hashed name, so the URL changes whenever the content does
+    and responses can be cached as immutable. The encoding is negotiated
+    from Accept-Encoding, and an If-None-Match for the same content gets a
+    304. Unhashed names are still served, but must be revalidated.
+    """
+    
+    def __init__(self, sources, gzip_level=9, brotli_quality=11):
+        """Initialize the pipeline with the asset sources by name"""
+        self.sources = sources
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self._assets = {}  # name -> _Asset
+        self._by_hashed_name = {}  # hashed name -> _Asset
+    
+    def build(self):
+        """Hash and compress every asset"""
+        self._assets = {
+            name: _Asset(name, source, self.gzip_level, self.brotli_quality)
+            for name, source in self.sources.items()
+        }
+        self._by_hashed_name = {asset.hashed_name: asset for asset in self._assets.values()}
+    
+    def init_app(self, app):
+        """Build the assets and add the /assets route to the app"""
+        self.build()
+        app.add_url_rule('/assets/<path:filename>', 'asset', self.serve)
+        app.url_defaults(self._hashed_url)
+    
+    def _hashed_url(self, endpoint, values):
+        if endpoint == 'asset' and 'filename' in values:
+            asset = self._assets.get(values['filename'])
+            if asset is not None:
+                values['filename'] = asset.hashed_name
+    
+    def url_path(self, name):
+        """Get the hashed path of an asset"""
+        return '/assets/' + self._assets[name].hashed_name
+    
+    def respond(self, asset, immutable):
+        """Build the response for an asset in the client's preferred encoding"""
+        encoding = asset.negotiate(request.accept_encodings)
+        response = make_response(asset.variants[encoding])
+        response.headers['Content-Type'] = asset.content_type
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.set_etag(asset.digest if encoding == 'identity' else f"{asset.digest}-{encoding}")
+        response.headers['Cache-Control'] = IMMUTABLE if immutable else 'no-cache'
+        return response.make_conditional(request)
+    
+    def serve(self, filename):
+        """View for /assets/<filename>"""
+        asset = self._by_hashed_name.get(filename)
+        if asset is not None:
+            return self.respond(asset, immutable=True)
+        asset = self._assets.get(filename)
+        if asset is None:
+            abort(404)
+        return self.respond(asset, immutable=False)
+    
+    def stats(self):
+        """Get each asset's hashed name and size per encoding"""
+        return {
+            name: {
+                'url': self.url_path(name),
+                'bytes': {encoding: len(body) for encoding, body in asset.variants.items()}
+            }
+            for name, asset in self._assets.items()
+        }
+
+
+# Pipeline for the site's stylesheet and script
+asset_pipeline = AssetPipeline(assets, gzip_level=config.ASSET_GZIP_LEVEL, brotli_quality=config.ASSET_BROTLI_QUALITY)
@@ -0,0 +1,241 @@
+import asyncio
+import os
+import random
+import threading
+import weakref
+
+import httpx
+
+import config
+import deadline
+from api_client import RETRY_STATUSES, _parse_response
+
+
+class AsyncLipiaClient:
+    """Non-blocking client for the Lipia API with the same methods as LipiaClient"""
+    
+    def __init__(self, base_url=None, api_key=None, max_connections=None, max_idle=None):
+        """Initialize the client with API settings"""
+        self.base_url = base_url or config.API_URL
+        self.api_key = api_key or config.API_KEY
+        self.connect_timeout = config.API_CONNECT_TIMEOUT  # Seconds to establish a connection
+        self.read_timeout = config.API_READ_TIMEOUT  # Seconds to wait for response data
+        self.max_retries = config.API_MAX_RETRIES
+        self.retry_base_delay = config.API_RETRY_BASE_DELAY
+        
+        # Connection pool settings
+        self.max_connections = max_connections or config.API_ASYNC_MAX_CONNECTIONS
+        self.max_idle = max_idle if max_idle is not None else config.API_POOL_MAX_IDLE
+        
+        # One connection pool per event loop, shared by every coroutine on it
+        self._clients = weakref.WeakKeyDictionary()
+        
+        # Background event loop used by the sync bridge
+        self._bridge_lock = threading.Lock()
+        self._bridge_loop = None
+        self._bridge_pid = None
+        self.sync = SyncBridge(self)
+    
+    def _get_client(self):
+        """Return the connection pool for the running event loop"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=self.max_idle
+                )
+            )
+            self._clients[loop] = client
+        return client
+    
+    def _retry_delay(self, attempt):
+        """Return the jittered backoff before a retry, or None if the deadline leaves no room"""
+        delay = random.uniform(0, self.retry_base_delay * (2 ** attempt))
+        remaining = deadline.remaining()
+        if remaining is not None and remaining <= delay + self.connect_timeout / 10:
+            return None
+        return delay
+    
+    async def _request(self, method, path, ok_statuses=(200,), raw_errors=False, retry=None, **kwargs):
+        """Send a request over the shared pool and parse the response
+        
+        As in LipiaClient, GET requests (or any request with retry=True) are
+        retried after connection errors, timeouts and 502/503/504 responses
+        while the request deadline allows.
+        """
+        if retry is None:
+            retry = method == 'GET'
+        attempt = 0
+        
+        while True:
+            connect_timeout, read_timeout = self.connect_timeout, self.read_timeout
+            remaining = deadline.remaining()
+            if remaining is not None:
+                if remaining <= 0:
+                    return False, "Request deadline exceeded"
+                connect_timeout, read_timeout = min(connect_timeout, remaining), min(read_timeout, remaining)
+            
+            error = response = None
+            try:
+                response = await self._get_client().request(
+                    method,
+                    f"{self.base_url}{path}",
+                    timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                    **kwargs
+                )
+            except httpx.TransportError as e:
+                error = e
+            except Exception as e:
+                return False, str(e)
+            
+            retryable = error is not None or response.status_code in RETRY_STATUSES
+            if retry and retryable and attempt < self.max_retries:
+                delay = self._retry_delay(attempt)
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                    attempt += 1
+                    continue
+            
+            if error is not None:
+                return False, str(error)
+            try:
+                return _parse_response(response, ok_statuses, raw_errors)
+            except Exception as e:
+                return False, str(e)
+    
+    async def aclose(self):
+        """Close the connection pool of the running event loop"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+    
+    def _get_bridge_loop(self):
+        """Return the bridge event loop, starting it in this process if needed"""
+        with self._bridge_lock:
+            if self._bridge_loop is None or self._bridge_pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='lipia-async-bridge', daemon=True)
+                thread.start()
+                self._bridge_loop = loop
+                self._bridge_pid = os.getpid()
+            return self._bridge_loop
+    
+    def run_sync(self, coro, timeout=None):
+        """Run a coroutine on the bridge event loop and wait for its result"""
+        loop = self._get_bridge_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coro.close()
+            raise RuntimeError("run_sync cannot be called from the bridge event loop")
+        
+        # Tasks on the bridge loop do not see the caller's context, so carry the deadline over
+        future = asyncio.run_coroutine_threadsafe(_with_deadline(coro, deadline.get()), loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+    
+    async def register_user(self, username, pin, phone_number=None):
+        """Register a new user"""
+        payload = {
+            'username': username,
+            'pin': pin
+        }
+        
+        if phone_number:
+            payload['phone_number'] = phone_number
+        
+        return await self._request('POST', "/users/register", ok_statuses=(201,), json=payload)
+    
+    async def login_user(self, username, pin):
+        """Login a user"""
+        payload = {
+            'username': username,
+            'pin': pin
+        }
+        
+        return await self._request('POST', "/users/login", json=payload)
+    
+    async def get_user(self, username):
+        """Get user data"""
+        return await self._request('GET', f"/users/{username}")
+    
+    async def get_user_payments(self, username):
+        """Get user payments"""
+        return await self._request('GET', f"/users/{username}/payments")
+    
+    async def initiate_payment(self, username, phone, plan_type='basic', idempotency_key=None):
+        """Initiate a payment
+        
+        The request is only retried when an idempotency key is given, so that
+        the backend can recognise a repeated attempt.
+        """
+        payload = {
+            'username': username,
+            'phone': phone,
+            'plan_type': plan_type
+        }
+        headers = {'Idempotency-Key': idempotency_key} if idempotency_key else None
+        
+        return await self._request(
+            'POST', "/payments/initiate",
+            ok_statuses=(200, 202), retry=bool(idempotency_key), json=payload, headers=headers
+        )
+    
+    async def get_payment_status(self, checkout_id):
+        """Get payment status"""
+        return await self._request('GET', f"/payments/{checkout_id}/status")
+    
+    async def consume_words(self, username, words):
+        """Consume words from a user's account"""
+        payload = {
+            'username': username,
+            'words': words
+        }
+        
+        return await self._request('POST', "/words/consume", json=payload)
+    
+    async def health_check(self):
+        """Check API health"""
+        return await self._request('GET', "/health", raw_errors=True)
+
+
+async def _with_deadline(coro, absolute_deadline):
+    """Await a coroutine under a deadline taken from another context"""
+    if absolute_deadline is not None:
+        deadline.set_absolute(absolute_deadline)
+    return await coro
+
+
+class SyncBridge:
+    """Blocking view of an AsyncLipiaClient for code that is not async yet
+    
+    Each method call runs the matching coroutine on the client's background
+    event loop, e.g. ``async_api_client.sync.get_user(username)``.
+    """
+    
+    def __init__(self, client):
+        self._client = client
+    
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+        if not asyncio.iscoroutinefunction(method):
+            raise AttributeError(name)
+        
+        def call(*args, **kwargs):
+            return self._client.run_sync(method(*args, **kwargs))
+        
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
+
+# Create a client instance
+async_api_client = AsyncLipiaClient()
@@ -0,0 +1,64 @@
+# Startup replay time of the transaction journal, before and after compaction
+#
+#   python benchmarks/bench_journal.py [transactions]
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from journal import TransactionJournal
+from models import TransactionStore
+
+# Replay budget for a worker start, in seconds
+TARGET = 2.0
+
+
+def replay(path):
+    store = TransactionStore()
+    start = time.perf_counter()
+    count = TransactionJournal(path).replay(store)
+    return count, time.perf_counter() - start
+
+
+def main():
+    transactions = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'transactions.journal')
+        journal = TransactionJournal(path, compact_bytes=2 ** 62)
+        
+        start = time.perf_counter()
+        for i in range(transactions):
+            journal.record_add({
+                'transaction_id': f"TXN{i:010d}",
+                'user_id': f"user{i % 1000}",
+                'phone_number': '0712345678',
+                'amount': 20,
+                'subscription_type': 'Basic',
+                'date': '2025-01-01 10:00:00',
+                'status': 'Pending',
+                'reference': 'N/A'
+            })
+            if i % 2 == 0:
+                journal.record_update(f"TXN{i:010d}", 'Completed', f"REF{i}")
+        journal.sync()
+        elapsed = time.perf_counter() - start
+        lines = journal.appended
+        print(f"appended {lines} lines in {elapsed:.2f}s ({lines / elapsed:.0f} lines/s), "
+              f"{os.path.getsize(path) / 2 ** 20:.1f} MiB")
+        
+        count, elapsed = replay(path)
+        print(f"replay journal only:   {count} transactions in {elapsed:.2f}s")
+        
+        compact_time = journal.compact()
+        print(f"compaction:            {compact_time:.2f}s")
+        
+        count, elapsed = replay(path)
+        status = "within" if elapsed <= TARGET else "over"
+        print(f"replay after compact:  {count} transactions in {elapsed:.2f}s ({status} the {TARGET:.1f}s target)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+# Cost of recording one backend call in the metrics registry
+#
+#   python benchmarks/bench_metrics.py [calls]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import MetricsRegistry
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    registry = MetricsRegistry()
+    endpoints = ['get_user', 'get_user_payments', 'get_payment_status', 'consume_words']
+    
+    # Baseline loop cost, so that only the recording is measured
+    start = time.perf_counter()
+    for i in range(calls):
+        endpoints[i & 3]
+    baseline = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for i in range(calls):
+        metrics = registry.endpoint(endpoints[i & 3])
+        metrics.start()
+        metrics.finish(0.042, 200, 512)
+    elapsed = time.perf_counter() - start
+    
+    per_call = (elapsed - baseline) / calls * 1e6
+    print(f"{calls} recordings, {per_call:.3f} us per call (lookup + start + finish)")
+
+
+if __name__ == '__main__':
+    main()
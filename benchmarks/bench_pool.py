@@ -0,0 +1,54 @@
+# Requests per second against a local stand-in backend, with and without pooling
+#
+#   python benchmarks/bench_pool.py [threads] [requests-per-thread]
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_client import LipiaClient
+from stub_backend import start_stub_backend
+
+
+def unpooled_get_user(base_url, username):
+    """The client's original behaviour: a fresh connection for every call"""
+    response = requests.get(f"{base_url}/users/{username}", timeout=30)
+    return response.status_code == 200, response.json()
+
+
+def run(label, call, threads, per_thread):
+    def worker(n):
+        for i in range(per_thread):
+            success, _ = call(f"user{n}")
+            assert success
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    elapsed = time.perf_counter() - start
+    total = threads * per_thread
+    print(f"{label:<10} {total:>6} requests in {elapsed:6.2f}s  {total / elapsed:8.1f} req/s")
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    server, base_url = start_stub_backend()
+    
+    try:
+        run("unpooled", lambda username: unpooled_get_user(base_url, username), threads, per_thread)
+        
+        # Timed below the read cache and single-flight, so every call reaches the backend
+        client = LipiaClient(base_url=base_url, pool_maxsize=threads)
+        run("pooled", lambda username: client._request('get_user', 'GET', f"/users/{username}"), threads, per_thread)
+        print("pool stats:", client.pool_stats())
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# Memory held by a million transactions as dicts versus slotted records
+#
+#   python benchmarks/bench_records.py [count]
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from records import Transaction
+
+STATUSES = ('Pending', 'Completed')
+PLANS = ('Free', 'Basic', 'Premium')
+
+
+def backend_json(i):
+    """A transaction decoded from backend JSON, so every string is a fresh object"""
+    return json.loads(
+        f'{{"transaction_id": "TXN{i:010d}", "user_id": "user{i % 10000}", '
+        f'"phone_number": "0712345678", "amount": 20, "subscription_type": "{PLANS[i % 3]}", '
+        f'"date": "2025-01-01 10:00:00", "status": "{STATUSES[i % 2]}", "reference": "REF{i}"}}'
+    )
+
+
+def measure(label, build, count):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    items = [build(i) for i in range(count)]
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<8} {current / count:>7.1f} bytes/record {current / 2 ** 20:>9.1f} MiB total  built in {elapsed:.2f}s")
+    del items
+    return current
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    as_dicts = measure("dict", backend_json, count)
+    as_records = measure("record", lambda i: Transaction.from_dict(backend_json(i)), count)
+    print(f"records use {100 * (1 - as_records / as_dicts):.0f}% less memory")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# Throughput of the phrase rewriter against dictionary size, versus chained str.replace
+#
+#   python benchmarks/bench_rewriter.py [megabytes]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rewriter import PhraseRewriter
+
+WORDS = [
+    ''.join(random.Random(i).choices('abcdefghijklmnopqrstuvwxyz', k=random.Random(-i).randint(2, 9)))
+    for i in range(5000)
+]
+
+
+def make_phrases(count, seed=1):
+    rng = random.Random(seed)
+    phrases = {}
+    while len(phrases) < count:
+        phrase = ' '.join(rng.choices(WORDS, k=rng.randint(2, 4)))
+        phrases[phrase.capitalize()] = 'rewritten ' + phrase.split()[0]
+    return phrases
+
+
+def make_text(megabytes, phrases, seed=2):
+    """Prose made of dictionary words, with about one phrase per sentence"""
+    rng = random.Random(seed)
+    phrase_list = list(phrases)
+    sentences = []
+    size = 0
+    while size < megabytes * 2 ** 20:
+        sentence = ' '.join(rng.choices(WORDS, k=12))
+        if phrase_list:
+            sentence += ' ' + rng.choice(phrase_list)
+        sentence = sentence.capitalize() + '. '
+        sentences.append(sentence)
+        size += len(sentence)
+    return ''.join(sentences)
+
+
+def chained_replace(text, phrases):
+    for phrase, replacement in phrases.items():
+        text = text.replace(phrase, replacement)
+    return text
+
+
+def check_case_mappings():
+    """Text whose lowercase changes length goes through the IGNORECASE fallback"""
+    rewriter = PhraseRewriter({'In conclusion': 'To sum up', 'in': 'inside'})
+    cases = {
+        'İN CONCLUSION it works': 'TO SUM UP it works',
+        'In conclusion, İ': 'To sum up, İ',
+        'İn İ': 'Inside İ',
+        'in  conclusion': 'to sum up',
+    }
+    for text, expected in cases.items():
+        result = rewriter.rewrite(text)
+        assert result == expected, (text, result, expected)
+
+
+def throughput(fn, text, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return len(text) / 2 ** 20 / best
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    check_case_mappings()
+    print(f"{'phrases':>8} {'compile':>9} {'rewriter':>11} {'str.replace':>12}")
+    for count in (3, 100, 1000, 10000, 50000):
+        phrases = make_phrases(count)
+        text = make_text(megabytes, phrases)
+        start = time.perf_counter()
+        rewriter = PhraseRewriter(phrases)
+        compile_time = time.perf_counter() - start
+        single_pass = throughput(rewriter.rewrite, text)
+        if count <= 1000:
+            chained = f"{throughput(lambda t: chained_replace(t, phrases), text, repeat=1):>7.2f} MB/s"
+        else:
+            chained = 'skipped'
+        print(f"{count:>8} {compile_time * 1000:>6.0f} ms {single_pass:>6.2f} MB/s {chained:>12}")
+
+
+if __name__ == '__main__':
+    main()
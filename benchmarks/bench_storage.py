@@ -0,0 +1,73 @@
+# Multi-process read/write throughput of the shared SQLite session store
+#
+#   python benchmarks/bench_storage.py [processes] [operations-per-process]
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import SQLiteStorage
+
+
+def worker(path, worker_id, operations, read_ratio, barrier, results):
+    storage = SQLiteStorage(path)
+    users = storage.users
+    transactions = storage.transactions
+    barrier.wait()
+    
+    start = time.perf_counter()
+    reads = writes = 0
+    for i in range(operations):
+        username = f"user{(worker_id * 7919 + i) % 5000}"
+        if i % 100 < read_ratio:
+            users.get(username)
+            reads += 1
+        else:
+            users[username] = {'username': username, 'words_remaining': i, 'plan': 'Basic'}
+            transactions.add({
+                'transaction_id': f"TXN{worker_id}-{i}",
+                'user_id': username,
+                'status': 'Pending',
+                'amount': 20
+            })
+            writes += 2
+    storage.flush()
+    results.put((reads, writes, time.perf_counter() - start))
+
+
+def run(processes, operations, read_ratio):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.db')
+        SQLiteStorage(path)  # Create the schema before the workers start
+        
+        barrier = multiprocessing.Barrier(processes)
+        results = multiprocessing.Queue()
+        workers = [
+            multiprocessing.Process(target=worker, args=(path, n, operations, read_ratio, barrier, results))
+            for n in range(processes)
+        ]
+        for process in workers:
+            process.start()
+        totals = [results.get() for _ in workers]
+        for process in workers:
+            process.join()
+    
+    reads = sum(r for r, _, _ in totals)
+    writes = sum(w for _, w, _ in totals)
+    elapsed = max(t for _, _, t in totals)
+    print(f"{processes} processes, {read_ratio:>3}% reads: "
+          f"{reads / elapsed:>10.0f} reads/s {writes / elapsed:>10.0f} writes/s")
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    for read_ratio in (95, 50, 5):
+        run(processes, operations, read_ratio)
+
+
+if __name__ == '__main__':
+    main()
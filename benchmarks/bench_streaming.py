@@ -0,0 +1,80 @@
+# Time to first byte and peak memory of /account, rendered whole versus streamed
+#
+#   python benchmarks/bench_streaming.py
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('JOURNAL_PATH', '')
+
+import config
+from app import app
+from records import User
+from template_registry import template_registry
+
+USER = User(username='demo', words_remaining=500, phone_number='0712345678', plan='Basic',
+            payment_status='Paid', created_at='2025-01-01')
+
+
+class History:
+    """Payment rows produced a page at a time, like utils.PaymentHistory"""
+    
+    def __init__(self, rows, page_size=25):
+        self.rows = rows
+        self.page_size = page_size
+        self.next_page = None
+    
+    def __bool__(self):
+        return self.rows > 0
+    
+    def __iter__(self):
+        for start in range(0, self.rows, self.page_size):
+            page = [
+                {'date': '2025-01-01 10:00', 'subscription_type': 'Basic', 'amount': 20,
+                 'status': 'Completed', 'reference': f"REF{i:08d}"}
+                for i in range(start, min(start + self.page_size, self.rows))
+            ]
+            yield from page
+
+
+def context(rows):
+    return {'user': USER, 'plan': config.pricing_plans['Basic'], 'transactions': History(rows), 'title': 'Account'}
+
+
+def measure_render(rows):
+    tracemalloc.start()
+    start = time.perf_counter()
+    body = template_registry.render('account.html', **context(rows)).encode()
+    first_byte = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first_byte, peak, len(body)
+
+
+def measure_stream(rows):
+    tracemalloc.start()
+    start = time.perf_counter()
+    chunks = iter(template_registry.stream('account.html', **context(rows)).response)
+    size = len(next(chunks).encode())
+    first_byte = time.perf_counter() - start
+    for chunk in chunks:
+        size += len(chunk.encode())  # Sent and dropped, as a WSGI server would
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first_byte, peak, size
+
+
+def main():
+    print(f"{'rows':>7} {'page':>9} {'render TTFB':>12} {'peak':>9} {'stream TTFB':>12} {'peak':>9}")
+    for rows in (25, 1000, 10000, 50000):
+        with app.test_request_context('/account'):
+            render_ttfb, render_peak, size = measure_render(rows)
+            stream_ttfb, stream_peak, _ = measure_stream(rows)
+        print(f"{rows:>7} {size / 2 ** 10:>6.0f} KiB {render_ttfb * 1000:>9.1f} ms {render_peak / 2 ** 10:>5.0f} KiB "
+              f"{stream_ttfb * 1000:>9.1f} ms {stream_peak / 2 ** 10:>5.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
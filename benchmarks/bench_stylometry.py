@@ -0,0 +1,46 @@
+# Time to score documents of growing size with the stylometric analyzer
+#
+#   python benchmarks/bench_stylometry.py
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stylometry import FORMAL_LEXICON, stylometric_analyzer
+
+VOCABULARY = [
+    ''.join(random.Random(i).choices('abcdefghijklmnopqrstuvwxyz', k=random.Random(-i).randint(1, 10)))
+    for i in range(20000)
+] + list(FORMAL_LEXICON)
+
+
+def make_document(words, seed=0):
+    """Sentences of varied length, with a sprinkling of formal words"""
+    rng = random.Random(seed)
+    sentences = []
+    while words > 0:
+        length = min(words, rng.randint(4, 30))
+        sentence = ' '.join(rng.choices(VOCABULARY, k=length))
+        sentences.append(sentence.capitalize() + rng.choice(('.', '.', '!', '?')))
+        words -= length
+    return ' '.join(sentences)
+
+
+def main():
+    print(f"{'words':>9} {'size':>9} {'time':>10} {'throughput':>12}")
+    for words in (100, 1000, 10000, 100000, 1000000):
+        text = make_document(words)
+        stylometric_analyzer.analyze(text)  # Warm up
+        runs = max(1, 200000 // words)
+        start = time.perf_counter()
+        for _ in range(runs):
+            stylometric_analyzer.analyze(text)
+        elapsed = (time.perf_counter() - start) / runs
+        megabytes = len(text) / 2 ** 20
+        print(f"{words:>9} {megabytes:>6.2f} MB {elapsed * 1000:>7.2f} ms {megabytes / elapsed:>7.1f} MB/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# Render time per page: compiling the source every request versus the template registry
+#
+#   python benchmarks/bench_templates.py [renders]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('JOURNAL_PATH', '')
+
+from flask import render_template_string
+
+import config
+from app import app
+from records import Transaction, User
+from template_registry import template_registry
+from templates import html_templates
+
+USER = User(username='demo', words_remaining=500, phone_number='0712345678', plan='Basic',
+            payment_status='Paid', created_at='2025-01-01')
+TRANSACTIONS = [
+    Transaction(transaction_id=f"TXN{i:010d}", user_id='demo', phone_number='0712345678', amount=20,
+                subscription_type='Basic', date='2025-01-01 10:00:00', status='Completed', reference=f"REF{i}")
+    for i in range(25)
+]
+PAGES = {
+    'index.html': {'pricing_plans': config.pricing_plans, 'title': 'Home'},
+    'login.html': {'title': 'Login'},
+    'dashboard.html': {'user': USER, 'plan': config.pricing_plans['Basic'], 'title': 'Dashboard'},
+    'account.html': {'user': USER, 'plan': config.pricing_plans['Basic'], 'transactions': TRANSACTIONS,
+                     'next_page': 2, 'title': 'Account'},
+    'upgrade.html': {'current_plan': {'name': 'Basic', **config.pricing_plans['Basic']},
+                     'available_plans': config.pricing_plans, 'title': 'Upgrade Plan'}
+}
+
+
+def per_render(render, renders):
+    render()  # Warm up
+    start = time.perf_counter()
+    for _ in range(renders):
+        render()
+    return (time.perf_counter() - start) / renders
+
+
+def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"templates compiled at startup in {template_registry.compile_time * 1000:.1f} ms")
+    print(f"{'page':<16} {'per request':>12} {'registry':>10} {'speedup':>8}")
+    with app.test_request_context('/'):
+        for name, context in PAGES.items():
+            # The old way, parsing and compiling the source on every request
+            before = per_render(lambda: render_template_string(html_templates[name], **context), renders)
+            after = per_render(lambda: template_registry.render(name, **context), renders)
+            print(f"{name:<16} {before * 1e6:>9.0f} µs {after * 1e6:>7.0f} µs {before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
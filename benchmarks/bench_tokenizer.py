@@ -0,0 +1,62 @@
+# Time and peak memory of counting and truncating a 1 MB text, split() versus the tokenizer
+#
+#   python benchmarks/bench_tokenizer.py [megabytes]
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tokenizer
+
+LIMIT = 1000  # The Premium plan's word limit
+
+
+def with_split(text):
+    """What /humanize used to do: split once to count, again to truncate"""
+    word_count = len(text.split())
+    words = text.split()
+    if len(words) > LIMIT:
+        text = " ".join(words[:LIMIT])
+    return word_count, text
+
+
+def with_tokenizer(text):
+    tokens = tokenizer.scan(text, LIMIT)
+    return tokens.count, text[:tokens.end] if tokens.truncated else text
+
+
+def full_scan(text):
+    return tokenizer.scan(text).count
+
+
+def full_scan_offsets(text):
+    return len(tokenizer.scan(text, offsets=True).offsets)
+
+
+def measure(label, fn, text):
+    start = time.perf_counter()
+    fn(text)
+    elapsed = time.perf_counter() - start
+    
+    tracemalloc.start()  # Separately, as tracing slows every allocation down
+    fn(text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<32} {elapsed * 1000:>8.2f} ms {peak / 2 ** 10:>9.0f} KiB peak")
+
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 1
+    sentence = "It is important to note that the results were broadly consistent. "
+    text = sentence * int(megabytes * 2 ** 20 / len(sentence))
+    print(f"{len(text) / 2 ** 20:.1f} MB, {len(text.split())} words, limit {LIMIT}")
+    measure("split() twice", with_split, text)
+    measure("tokenizer, stopping at limit", with_tokenizer, text)
+    measure("tokenizer, whole text", full_scan, text)
+    measure("tokenizer, whole text + offsets", full_scan_offsets, text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# Lookup cost of the indexed transaction store against the old list scans
+#
+#   python benchmarks/bench_transactions.py [sizes...]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import TransactionStore
+
+
+def make_transaction(i):
+    return {
+        'transaction_id': f"TXN{i:010d}",
+        'user_id': f"user{i % 1000}",
+        'amount': 20,
+        'subscription_type': 'Basic',
+        'status': 'Pending' if i % 50 == 0 else 'Completed',
+        'reference': 'N/A'
+    }
+
+
+def per_op(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def scan_get(records, transaction_id):
+    for transaction in records:
+        if transaction.get('transaction_id') == transaction_id:
+            return transaction
+    return None
+
+
+def main():
+    sizes = [int(size) for size in sys.argv[1:]] or [10000, 100000, 1000000]
+    print(f"{'records':>9} {'op':<14} {'list scan us':>14} {'indexed us':>12}")
+    
+    for size in sizes:
+        records = [make_transaction(i) for i in range(size)]
+        store = TransactionStore()
+        for transaction in records:
+            store.add(dict(transaction))
+        
+        targets = [f"TXN{random.randrange(size):010d}" for _ in range(100)]
+        scan_repeat = max(1, 2000000 // size)
+        
+        rows = [
+            ('get', lambda: scan_get(records, random.choice(targets)), lambda: store.get(random.choice(targets))),
+            ('by user', lambda: [t for t in records if t.get('user_id') == 'user7'], lambda: store.for_user('user7')),
+            ('pending', lambda: [t for t in records if t.get('status') == 'Pending'], lambda: store.with_status('Pending'))
+        ]
+        for name, scan, indexed in rows:
+            print(f"{size:>9} {name:<14} {per_op(scan, scan_repeat):>14.1f} {per_op(indexed, 200):>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# Local stand-in for the Lipia backend API, used by the benchmarks
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every request with a small JSON body over keep-alive HTTP/1.1"""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    delay = 0.0
+    
+    def _reply(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        if self.delay:
+            time.sleep(self.delay)
+        
+        body = json.dumps({
+            'username': 'bench',
+            'words_remaining': 500,
+            'plan': 'Basic',
+            'payment_status': 'Paid',
+            'path': self.path
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    do_GET = _reply
+    do_POST = _reply
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_backend(delay=0.0):
+    """Start the stand-in backend on a free port and return (server, base_url)"""
+    handler = type('DelayedStubHandler', (StubHandler,), {'delay': delay})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_port}/api"
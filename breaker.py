@@ -0,0 +1,82 @@
+import threading
+import time
+
+
+class CircuitBreaker:
+    """Circuit breaker for one backend endpoint
+    
+    Closed: calls go through and consecutive failures are counted.
+    Open: calls are rejected straight away until recovery_timeout passes.
+    Half-open: a limited number of trial calls decide whether to close again.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, name, failure_threshold=5, recovery_timeout=30, half_open_max_calls=1):
+        """Initialize the breaker in the closed state"""
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_calls = 0
+        self.rejected = 0
+        self.times_opened = 0
+    
+    def allow(self):
+        """Check whether a call may go to the backend now"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    self.rejected += 1
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_calls = 0
+            
+            if self._state == self.HALF_OPEN:
+                if self._trial_calls >= self.half_open_max_calls:
+                    self.rejected += 1
+                    return False
+                self._trial_calls += 1
+            
+            return True
+    
+    def record_success(self):
+        """Record a call that reached a healthy backend"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+    
+    def record_failure(self):
+        """Record a call that failed because of the backend"""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+    
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self._state
+    
+    def snapshot(self):
+        """Get the breaker state and counters"""
+        state = self.state
+        with self._lock:
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'times_opened': self.times_opened,
+                'rejected': self.rejected
+            }
@@ -0,0 +1,80 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Sentinel for cache misses, so that None can be cached
+MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire a fixed time after being set"""
+    
+    def __init__(self, maxsize=1024, ttl=30):
+        """Initialize the cache with a maximum entry count and a TTL in seconds"""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value), oldest first
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def get(self, key, default=MISSING):
+        """Get a live entry and mark it as recently used"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key, value):
+        """Add or replace an entry, evicting the least recently used ones if full"""
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+    
+    def pop(self, key):
+        """Remove an entry if present"""
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def stats(self):
+        """Get hit, miss and eviction counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
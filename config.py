@@ -11,6 +11,37 @@ APP_NAME = os.environ.get('APP_NAME', 'Lipia Subscription Service')
 API_URL = os.environ.get('API_URL', 'http://localhost:5000/api')
 API_KEY = os.environ.get('API_KEY', 'your-api-key-here')
 
+# API timeouts and retries
+API_CONNECT_TIMEOUT = float(os.environ.get('API_CONNECT_TIMEOUT', 3.05))  # Seconds to establish a connection
+API_READ_TIMEOUT = float(os.environ.get('API_READ_TIMEOUT', 15))  # Seconds to wait for response data
+API_REQUEST_BUDGET = float(os.environ.get('API_REQUEST_BUDGET', 20))  # Seconds of backend time per page request
+API_MAX_RETRIES = int(os.environ.get('API_MAX_RETRIES', 2))  # Retries for idempotent requests
+API_RETRY_BASE_DELAY = float(os.environ.get('API_RETRY_BASE_DELAY', 0.1))  # Seconds, doubled on each retry
+
+# API connection pool settings (per worker process)
+API_POOL_CONNECTIONS = int(os.environ.get('API_POOL_CONNECTIONS', 4))  # Number of hosts to keep pools for
+API_POOL_MAXSIZE = int(os.environ.get('API_POOL_MAXSIZE', 16))  # Keep-alive connections per host
+API_POOL_MAX_IDLE = float(os.environ.get('API_POOL_MAX_IDLE', 60))  # Seconds idle before the pool is recycled
+API_ASYNC_MAX_CONNECTIONS = int(os.environ.get('API_ASYNC_MAX_CONNECTIONS', 100))  # Connections shared by the async client
+
+# Concurrent backend reads (fan-out)
+API_FANOUT_WORKERS = int(os.environ.get('API_FANOUT_WORKERS', 8))  # Threads per worker process
+API_FANOUT_TIMEOUT = float(os.environ.get('API_FANOUT_TIMEOUT', 10))  # Deadline in seconds for a whole set of calls
+
+# Read-through cache for user and payment data
+API_CACHE_TTL = float(os.environ.get('API_CACHE_TTL', 30))  # Seconds, 0 disables the cache
+API_CACHE_MAXSIZE = int(os.environ.get('API_CACHE_MAXSIZE', 1024))  # Entries per worker
+API_VALIDATOR_TTL = float(os.environ.get('API_VALIDATOR_TTL', 3600))  # Seconds to keep ETags and their bodies
+
+# Payment history paging
+PAYMENTS_PAGE_SIZE = int(os.environ.get('PAYMENTS_PAGE_SIZE', 25))  # Rows per page on /account
+PAYMENTS_STREAM_PAGES = int(os.environ.get('PAYMENTS_STREAM_PAGES', 8))  # Pages streamed into /account before "Load more"
+
+# Circuit breaker, applied per backend endpoint
+API_BREAKER_FAILURE_THRESHOLD = int(os.environ.get('API_BREAKER_FAILURE_THRESHOLD', 5))  # Consecutive failures before opening
+API_BREAKER_RECOVERY_TIMEOUT = float(os.environ.get('API_BREAKER_RECOVERY_TIMEOUT', 30))  # Seconds open before a trial call
+API_BREAKER_HALF_OPEN_CALLS = int(os.environ.get('API_BREAKER_HALF_OPEN_CALLS', 1))  # Trial calls allowed while half-open
+
 # Pricing plans
 pricing_plans = {
     "Free": {
@@ -30,6 +61,60 @@ pricing_plans = {
     }
 }
 
+# Phrases the humanizer rewrites, matched as whole words in any case
+humanize_phrases = {
+    "In conclusion": "To sum up",
+    "It is important to note": "Keep in mind",
+    "In this essay": "Here"
+}
+
+# Local word quota ledger
+QUOTA_FLUSH_INTERVAL = float(os.environ.get('QUOTA_FLUSH_INTERVAL', 5))  # Seconds between batched consume calls
+QUOTA_FLUSH_WORDS = int(os.environ.get('QUOTA_FLUSH_WORDS', 200))  # Pending words that trigger an early flush
+QUOTA_MAX_DRIFT = int(os.environ.get('QUOTA_MAX_DRIFT', 500))  # Most unsent words a user may have per worker
+
+# Background payment status polling
+PAYMENT_POLL_CONCURRENCY = int(os.environ.get('PAYMENT_POLL_CONCURRENCY', 4))  # Status calls in flight per worker
+PAYMENT_POLL_BASE_DELAY = float(os.environ.get('PAYMENT_POLL_BASE_DELAY', 5))  # Seconds before the first poll
+PAYMENT_POLL_MAX_DELAY = float(os.environ.get('PAYMENT_POLL_MAX_DELAY', 120))  # Longest wait between polls
+PAYMENT_POLL_MAX_ATTEMPTS = int(os.environ.get('PAYMENT_POLL_MAX_ATTEMPTS', 30))  # Polls before giving up on a checkout
+PAYMENT_POLL_RESCAN_INTERVAL = float(os.environ.get('PAYMENT_POLL_RESCAN_INTERVAL', 900))  # Seconds between scans for untracked pending payments, 0 disables
+PAYMENT_POLL_EXPIRE_AFTER = float(os.environ.get('PAYMENT_POLL_EXPIRE_AFTER', 3600))  # Seconds after which a stored pending payment is marked Expired
+PAYMENT_POLL_LOCK_PATH = os.environ.get('PAYMENT_POLL_LOCK_PATH', 'lipia_poller.lock')  # Held by the one worker that rescans a shared store
+
+# Per-worker user session storage
+USER_STORE_MAX_ENTRIES = int(os.environ.get('USER_STORE_MAX_ENTRIES', 10000))  # 0 for no entry limit
+USER_STORE_MAX_BYTES = int(os.environ.get('USER_STORE_MAX_BYTES', 0))  # Approximate bytes, 0 for no limit
+USER_STORE_IDLE_TTL = float(os.environ.get('USER_STORE_IDLE_TTL', 3600))  # Seconds unused before a user expires
+
+# Session storage backend: 'memory' (per worker) or 'sqlite' (shared by all workers on a host)
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'memory').lower()
+STORAGE_PATH = os.environ.get('STORAGE_PATH', 'lipia_sessions.db')
+STORAGE_BATCH_SIZE = int(os.environ.get('STORAGE_BATCH_SIZE', 100))  # Buffered writes that trigger a commit
+STORAGE_FLUSH_INTERVAL = float(os.environ.get('STORAGE_FLUSH_INTERVAL', 0.05))  # Seconds between commits
+
+# Transaction journal for the memory backend, an empty path disables it
+JOURNAL_PATH = os.environ.get('JOURNAL_PATH', 'lipia_transactions.journal')
+JOURNAL_FSYNC_INTERVAL = float(os.environ.get('JOURNAL_FSYNC_INTERVAL', 0.05))  # Seconds between fsyncs
+JOURNAL_FSYNC_BATCH = int(os.environ.get('JOURNAL_FSYNC_BATCH', 64))  # Unsynced lines that trigger an fsync
+JOURNAL_COMPACT_BYTES = int(os.environ.get('JOURNAL_COMPACT_BYTES', 8 * 2 ** 20))  # Journal size that triggers compaction
+
+# Whole-response cache for anonymous visitors to the public pages
+PAGE_CACHE_MAXSIZE = int(os.environ.get('PAGE_CACHE_MAXSIZE', 64))  # Pages per worker, 0 disables the cache
+PAGE_CACHE_TTL = float(os.environ.get('PAGE_CACHE_TTL', 300))  # Seconds before a page is rendered again
+PAGE_CACHE_CHECK_INTERVAL = float(os.environ.get('PAGE_CACHE_CHECK_INTERVAL', 1))  # Seconds between config change checks
+
+# Results of /detect and /humanize, shared by all users of a worker
+RESULT_CACHE_MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_BYTES', 32 * 2 ** 20))  # Approximate bytes, 0 disables the cache
+
+# Directory for compiled template bytecode shared by worker boots, empty to disable
+TEMPLATE_BYTECODE_DIR = os.environ.get('TEMPLATE_BYTECODE_DIR', '')
+TEMPLATE_STREAM_BUFFER = int(os.environ.get('TEMPLATE_STREAM_BUFFER', 32))  # Output pieces per streamed chunk, 1 sends each
+
+# Static asset compression, done once at startup
+ASSET_GZIP_LEVEL = int(os.environ.get('ASSET_GZIP_LEVEL', 9))  # 1 (fastest) to 9 (smallest)
+ASSET_BROTLI_QUALITY = int(os.environ.get('ASSET_BROTLI_QUALITY', 11))  # 0 to 11, used if brotli is installed
+
 # Flask settings
 DEBUG = os.environ.get('DEBUG', 'True').lower() in ('true', '1', 't')
 SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-here')
@@ -0,0 +1,33 @@
+# Per-request time budget shared by every backend call made while serving it
+import contextvars
+import time
+
+_deadline = contextvars.ContextVar('lipia_deadline', default=None)
+
+
+def start(budget):
+    """Give the current context a deadline budget seconds from now, returns a reset token"""
+    return _deadline.set(time.monotonic() + budget)
+
+
+def reset(token):
+    """Restore the deadline that was in place before start()"""
+    _deadline.reset(token)
+
+
+def get():
+    """Get the absolute deadline (time.monotonic() based), or None if unbounded"""
+    return _deadline.get()
+
+
+def set_absolute(deadline):
+    """Apply an absolute deadline taken from another context, returns a reset token"""
+    return _deadline.set(deadline)
+
+
+def remaining():
+    """Get the seconds left before the deadline, or None if unbounded"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(deadline - time.monotonic(), 0.0)
@@ -0,0 +1,191 @@
+# Durable journal of transaction changes for the in-memory session storage
+import fcntl
+import gc
+import json
+import os
+import threading
+import time
+
+from records import Transaction
+
+
+class TransactionJournal:
+    """Append-only, fsync-batched journal with snapshot compaction
+    
+    Every add and update is appended as one JSON line. Lines are written
+    with a single O_APPEND write, so several worker processes can share a
+    journal, and fsync is batched: at most fsync_interval seconds or
+    fsync_batch lines go unsynced. Once the journal grows past
+    compact_bytes it is folded into a snapshot file and truncated, which
+    keeps startup replay time bounded. Replay reads the snapshot, then the
+    journal; applying a line twice is harmless.
+    """
+    
+    def __init__(self, path, fsync_interval=0.05, fsync_batch=64, compact_bytes=8 * 2 ** 20):
+        self.path = path
+        self.snapshot_path = path + '.snapshot'
+        self.lock_path = path + '.lock'
+        self.fsync_interval = fsync_interval
+        self.fsync_batch = fsync_batch
+        self.compact_bytes = compact_bytes
+        
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._pid = None
+        self._fd = None
+        self._lock_fd = None
+        self._unsynced = 0
+        self.appended = 0
+        self.syncs = 0
+        self.compactions = 0
+    
+    def _open(self):
+        """Open the journal in this process, starting the sync thread"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+                self._unsynced = 0
+                self._pid = os.getpid()
+                thread = threading.Thread(target=self._run_syncer, name='journal-sync', daemon=True)
+                thread.start()
+    
+    def _append(self, entry):
+        self._open()
+        line = (json.dumps(entry, separators=(',', ':')) + '\n').encode()
+        with self._lock:
+            # Threads share one lock file description, so they append one at a time
+            fcntl.flock(self._lock_fd, fcntl.LOCK_SH)  # Compaction holds LOCK_EX
+            try:
+                os.write(self._fd, line)
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            self.appended += 1
+            self._unsynced += 1
+            due = self._unsynced >= self.fsync_batch
+        if due:
+            self._wake.set()
+    
+    def record_add(self, transaction):
+        """Append a new or replaced transaction"""
+        if hasattr(transaction, 'to_dict'):
+            transaction = transaction.to_dict()
+        self._append({'op': 'add', 'transaction': transaction})
+    
+    def record_update(self, transaction_id, status, reference=None):
+        """Append a status change"""
+        self._append({'op': 'update', 'id': transaction_id, 'status': status, 'reference': reference})
+    
+    def _run_syncer(self):
+        while True:
+            self._wake.wait(self.fsync_interval)
+            self._wake.clear()
+            try:
+                self.sync()
+                if os.fstat(self._fd).st_size > self.compact_bytes:
+                    self.compact()
+            except Exception as e:
+                print(f"Transaction journal sync failed: {e}")
+    
+    def sync(self):
+        """Flush appended lines to disk"""
+        with self._lock:
+            if not self._unsynced or self._pid != os.getpid():
+                return
+            self._unsynced = 0
+        os.fsync(self._fd)
+        self.syncs += 1
+    
+    def _read_state(self):
+        """Fold the snapshot and the journal into transaction dicts keyed by ID"""
+        state = {}
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'rb') as snapshot:
+                for line in snapshot:
+                    try:
+                        transaction = json.loads(line)
+                    except ValueError:
+                        continue
+                    state[transaction.get('transaction_id')] = transaction
+        
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as journal:
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # A line torn by a crash
+                    if entry.get('op') == 'add':
+                        transaction = entry['transaction']
+                        state[transaction.get('transaction_id')] = transaction
+                    elif entry.get('op') == 'update':
+                        transaction = state.get(entry.get('id'))
+                        if transaction is not None:
+                            transaction['status'] = entry.get('status')
+                            if entry.get('reference'):
+                                transaction['reference'] = entry['reference']
+        return state
+    
+    def replay(self, store):
+        """Load the journaled transactions into a store, returns how many"""
+        # Replay allocates a lot of long-lived objects and none of them are
+        # garbage, so the cyclic collector's passes over them are wasted
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            # Shared like an append, so another worker cannot compact between
+            # the snapshot and the journal being read
+            lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_SH)
+                state = self._read_state()
+            finally:
+                os.close(lock_fd)  # Releases the lock
+            from_dict = Transaction.from_dict
+            store.load(from_dict(transaction) for transaction in state.values())
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        return len(state)
+    
+    def compact(self):
+        """Fold the journal into the snapshot and truncate it"""
+        self._open()
+        started = time.monotonic()
+        with self._compact_lock:
+            # A separate description, so that the lock excludes this process's appenders too
+            lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX)
+                self._compact()
+            finally:
+                os.close(lock_fd)  # Releases the lock
+        self.compactions += 1
+        return time.monotonic() - started
+    
+    def _compact(self):
+        state = self._read_state()
+        temporary = self.snapshot_path + '.tmp'
+        with open(temporary, 'wb') as snapshot:
+            for transaction in state.values():
+                snapshot.write((json.dumps(transaction, separators=(',', ':')) + '\n').encode())
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary, self.snapshot_path)
+        
+        # Lines replayed twice after a crash here are harmless
+        os.truncate(self.path, 0)
+        os.fsync(self._fd)
+    
+    def stats(self):
+        """Get journal counters"""
+        return {
+            'path': self.path,
+            'appended': self.appended,
+            'syncs': self.syncs,
+            'compactions': self.compactions,
+            'journal_bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        }
@@ -0,0 +1,217 @@
+import atexit
+import os
+import threading
+
+import config
+from api_client import BackendRejection, api_client
+
+
+class _Account:
+    """Local view of one user's word balance"""
+    
+    __slots__ = ('balance', 'pending', 'in_flight')
+    
+    def __init__(self, balance):
+        self.balance = balance  # Words the user can still spend, as far as this worker knows
+        self.pending = 0  # Words spent locally and not yet sent to the backend
+        self.in_flight = 0  # Words being sent to the backend right now
+
+
+class QuotaLedger:
+    """In-process word quota with batched consumption sent to the backend
+    
+    Each account is seeded from the user's words_remaining. Requests are
+    checked and deducted locally, and the words spent are sent to
+    /words/consume per user, either every flush_interval seconds or as soon
+    as flush_words are pending. A user with more than max_drift unsent words
+    is flushed before any further words are accepted, and refused while the
+    flush fails, which bounds how far this worker can run ahead of the
+    backend. Words the backend rejects with a 4xx are dropped, and words it
+    could not be reached for are kept for the next flush.
+    """
+    
+    def __init__(self, client, plans, flush_interval=5, flush_words=200, max_drift=500):
+        """Initialize the ledger with the backend client and the pricing plans"""
+        self.client = client
+        self.plans = plans
+        self.flush_interval = flush_interval
+        self.flush_words = flush_words
+        self.max_drift = max_drift
+        
+        self._lock = threading.Lock()
+        self._accounts = {}
+        self._wake = threading.Event()
+        self._flusher_pid = None
+        self.flushes = 0
+        self.flush_failures = 0
+        self.rejected = 0
+    
+    def _start_flusher(self):
+        """Start the background flush thread in this process if needed"""
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid != os.getpid():
+                self._flusher_pid = os.getpid()
+                thread = threading.Thread(target=self._run_flusher, name='quota-flusher', daemon=True)
+                thread.start()
+    
+    def _run_flusher(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush_all()
+    
+    def _get_account(self, username, user_data):
+        """Return the user's account, seeding it from user data on first use"""
+        with self._lock:
+            account = self._accounts.get(username)
+        if account is not None:
+            return account
+        
+        words_remaining = (user_data or {}).get('words_remaining')
+        if words_remaining is None:
+            success, response = self.client.get_user(username)
+            words_remaining = response.get('words_remaining', 0) if success else 0
+        
+        with self._lock:
+            return self._accounts.setdefault(username, _Account(int(words_remaining)))
+    
+    def consume(self, username, words, user_data, truncated=False):
+        """Check and deduct words for a request, calling the backend only when needed
+        
+        Requests over the plan's word_limit are rejected, either by their
+        count or, for a count already capped at the limit, by truncated. The
+        backend is asked for a fresh balance only when the local one is too
+        low, since words may have been bought since it was last read.
+        Returns (success, message).
+        """
+        self._start_flusher()
+        plan = (user_data or {}).get('plan', 'Free')
+        limit = self.plans.get(plan, self.plans['Free'])['word_limit']
+        if truncated or words > limit:
+            self.rejected += 1
+            return False, f"Text exceeds your plan limit of {limit} words per round."
+        
+        account = self._get_account(username, user_data)
+        if account.pending + words > self.max_drift:
+            self.flush(username)
+        
+        refreshed = False
+        while True:
+            with self._lock:
+                if account.pending and account.pending + words > self.max_drift:
+                    # The flush failed, so accepting would let unsent words grow without bound
+                    self.rejected += 1
+                    return False, "Word balance is being updated, please try again shortly."
+                if words <= account.balance:
+                    account.balance -= words
+                    account.pending += words
+                    flush_due = account.pending >= self.flush_words
+                    break
+                if refreshed:
+                    self.rejected += 1
+                    return False, "Failed to process: Insufficient words"
+            self.refresh(username)
+            refreshed = True
+        
+        if flush_due:
+            self._wake.set()
+        return True, "Words consumed"
+    
+    def balance(self, username):
+        """Get the user's locally known balance, or None if not tracked"""
+        with self._lock:
+            account = self._accounts.get(username)
+            return account.balance if account is not None else None
+    
+    def sync(self, username, user_data):
+        """Reconcile with fresh backend user data, updating it with local spending"""
+        words_remaining = (user_data or {}).get('words_remaining')
+        if words_remaining is None:
+            return
+        with self._lock:
+            account = self._accounts.get(username)
+            if account is None:
+                return
+            account.balance = max(int(words_remaining) - account.pending - account.in_flight, 0)
+            user_data['words_remaining'] = account.balance
+    
+    def refresh(self, username):
+        """Re-read a tracked user's balance from the backend"""
+        with self._lock:
+            if username not in self._accounts:
+                return
+        success, user_data = self.client.get_user(username)
+        if success and isinstance(user_data, dict):
+            self.sync(username, user_data)
+    
+    def flush(self, username):
+        """Send the user's pending words to the backend and reconcile the balance"""
+        with self._lock:
+            account = self._accounts.get(username)
+            if account is None or not account.pending or account.in_flight:
+                return
+            words = account.pending
+            account.pending = 0
+            account.in_flight = words
+        
+        success, response = self.client.consume_words(username, words)
+        if success:
+            self.flushes += 1
+            with self._lock:
+                account.in_flight = 0
+                if isinstance(response, dict) and response.get('words_remaining') is not None:
+                    account.balance = max(int(response['words_remaining']) - account.pending, 0)
+            return
+        
+        self.flush_failures += 1
+        if not isinstance(response, BackendRejection):
+            # A 5xx, timeout or open breaker, keep the words for the next flush
+            with self._lock:
+                account.in_flight = 0
+                account.pending += words
+            return
+        
+        # The backend refused the words, so they are dropped and its balance is authoritative
+        success, user_response = self.client.get_user(username)
+        with self._lock:
+            account.in_flight = 0
+            if success:
+                account.balance = max(int(user_response.get('words_remaining', 0)) - account.pending, 0)
+    
+    def flush_all(self):
+        """Flush every account with pending words"""
+        with self._lock:
+            usernames = [name for name, account in self._accounts.items() if account.pending]
+        for username in usernames:
+            self.flush(username)
+    
+    def forget(self, username):
+        """Flush and stop tracking a user"""
+        self.flush(username)
+        with self._lock:
+            account = self._accounts.get(username)
+            if account is not None and not account.pending and not account.in_flight:
+                del self._accounts[username]
+    
+    def stats(self):
+        """Get ledger counters"""
+        with self._lock:
+            return {
+                'accounts': len(self._accounts),
+                'pending_words': sum(account.pending for account in self._accounts.values()),
+                'flushes': self.flushes,
+                'flush_failures': self.flush_failures,
+                'rejected': self.rejected
+            }
+
+# Create a ledger instance and send outstanding words when the worker exits
+quota_ledger = QuotaLedger(
+    api_client,
+    config.pricing_plans,
+    flush_interval=config.QUOTA_FLUSH_INTERVAL,
+    flush_words=config.QUOTA_FLUSH_WORDS,
+    max_drift=config.QUOTA_MAX_DRIFT
+)
+atexit.register(quota_ledger.flush_all)
@@ -0,0 +1,106 @@
+import threading
+from bisect import bisect_left
+
+# Latency bucket upper bounds in seconds, the last bucket catches everything slower
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram"""
+    
+    __slots__ = ('buckets', 'counts', 'count', 'total')
+    
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+    
+    def observe(self, value):
+        """Add one observation, the caller holds the owning lock"""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+    
+    def snapshot(self):
+        """Get cumulative bucket counts keyed by upper bound"""
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'buckets': buckets
+        }
+
+
+class EndpointMetrics:
+    """Latency, status, error, byte and in-flight figures for one endpoint"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = Histogram()
+        self.status_codes = {}
+        self.errors = 0
+        self.bytes_received = 0
+        self.in_flight = 0
+    
+    def start(self):
+        """Record a call leaving for the backend"""
+        with self._lock:
+            self.in_flight += 1
+    
+    def finish(self, seconds, status_code=None, bytes_received=0):
+        """Record a finished call; a missing status code means it raised"""
+        with self._lock:
+            self.in_flight -= 1
+            self.latency.observe(seconds)
+            if status_code is None:
+                self.errors += 1
+            else:
+                self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+                self.bytes_received += bytes_received
+    
+    def snapshot(self):
+        with self._lock:
+            return {
+                'latency': self.latency.snapshot(),
+                'status_codes': {str(code): count for code, count in self.status_codes.items()},
+                'errors': self.errors,
+                'bytes_received': self.bytes_received,
+                'in_flight': self.in_flight
+            }
+
+
+class MetricsRegistry:
+    """In-process registry of per-endpoint backend metrics
+    
+    snapshot() returns plain dicts, so a metrics endpoint or a log exporter
+    can read it without knowing about the classes here.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+    
+    def endpoint(self, name):
+        """Return the metrics for an endpoint, creating them on first use"""
+        metrics = self._endpoints.get(name)
+        if metrics is None:
+            with self._lock:
+                metrics = self._endpoints.setdefault(name, EndpointMetrics())
+        return metrics
+    
+    def snapshot(self):
+        """Get the metrics of every endpoint"""
+        return {name: metrics.snapshot() for name, metrics in list(self._endpoints.items())}
+    
+    def reset(self):
+        """Drop all recorded metrics"""
+        with self._lock:
+            self._endpoints = {}
+
+# Registry shared by the backend clients in this process
+registry = MetricsRegistry()
@@ -1,15 +1,246 @@
 # This file provides in-memory session storage for demonstration purposes
 # In a production environment, you would use a database or other persistent storage
+import threading
+import time
+from collections import OrderedDict
 
-# In-memory user database (only used for session storage, not persistent)
-users_db = {}
+import config
+from records import Transaction, User
+from sizing import approximate_size
 
-# In-memory transactions database (only used for session storage, not persistent)
-transactions_db = []
+
+class UserStore:
+    """In-memory user sessions bounded by entry count and approximate size
+    
+    Entries unused for idle_ttl seconds expire, and the least recently used
+    entries are evicted once max_entries or max_bytes is exceeded. A limit
+    of 0 disables it. Callers must treat a missing user as a cache miss.
+    """
+    
+    def __init__(self, max_entries=10000, max_bytes=0, idle_ttl=3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.idle_ttl = idle_ttl
+        self._lock = threading.Lock()
+        self._data = OrderedDict()  # username -> [last_used, size, user_data], least recent first
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def _remove(self, username):
+        _, size, _ = self._data.pop(username)
+        self._bytes -= size
+    
+    def _expire_idle(self, now):
+        """Drop idle entries from the least recently used end"""
+        while self._data and self.idle_ttl:
+            username, (last_used, _, _) = next(iter(self._data.items()))
+            if now - last_used <= self.idle_ttl:
+                break
+            self._remove(username)
+            self.expirations += 1
+    
+    def get(self, username, default=None):
+        """Get a user and mark it as recently used"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(username)
+            if entry is not None and self.idle_ttl and now - entry[0] > self.idle_ttl:
+                self._remove(username)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            entry[0] = now
+            self._data.move_to_end(username)
+            self.hits += 1
+            return entry[2]
+    
+    def __contains__(self, username):
+        return self.get(username) is not None
+    
+    def __setitem__(self, username, user_data):
+        now = time.monotonic()
+        size = approximate_size(user_data)
+        with self._lock:
+            if username in self._data:
+                self._remove(username)
+            self._data[username] = [now, size, user_data]
+            self._bytes += size
+            
+            self._expire_idle(now)
+            while len(self._data) > 1 and (
+                (self.max_entries and len(self._data) > self.max_entries)
+                or (self.max_bytes and self._bytes > self.max_bytes)
+            ):
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+    
+    def pop(self, username, default=None):
+        with self._lock:
+            if username not in self._data:
+                return default
+            user_data = self._data[username][2]
+            self._remove(username)
+            return user_data
+    
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def stats(self):
+        """Get occupancy and eviction counters"""
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'approximate_bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'idle_ttl': self.idle_ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class TransactionStore:
+    """In-memory transactions indexed by transaction ID, user and status
+    
+    Records are kept in insertion order. Changes must go through add() and
+    update() so that the user and status indexes stay correct.
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_id = {}  # transaction_id -> transaction
+        self._by_user = {}  # user_id -> {transaction_id: None}, insertion ordered
+        self._by_status = {}  # status -> {transaction_id: None}
+    
+    def _index(self, transaction):
+        transaction_id = transaction.get('transaction_id')
+        self._by_user.setdefault(transaction.get('user_id'), {})[transaction_id] = None
+        self._by_status.setdefault(transaction.get('status'), {})[transaction_id] = None
+    
+    def _unindex(self, transaction):
+        transaction_id = transaction.get('transaction_id')
+        for index, value in ((self._by_user, transaction.get('user_id')), (self._by_status, transaction.get('status'))):
+            ids = index.get(value)
+            if ids is not None:
+                ids.pop(transaction_id, None)
+                if not ids:
+                    del index[value]
+    
+    def add(self, transaction):
+        """Add a transaction, replacing any with the same ID"""
+        with self._lock:
+            previous = self._by_id.get(transaction.get('transaction_id'))
+            if previous is not None:
+                self._unindex(previous)
+            self._by_id[transaction.get('transaction_id')] = transaction
+            self._index(transaction)
+    
+    def load(self, transactions):
+        """Add many transactions at once, as when replaying a journal"""
+        with self._lock:
+            by_id, by_user, by_status = self._by_id, self._by_user, self._by_status
+            for transaction in transactions:
+                transaction_id = transaction.get('transaction_id')
+                user_id = transaction.get('user_id')
+                status = transaction.get('status')
+                previous = by_id.get(transaction_id)
+                if previous is not None:
+                    self._unindex(previous)
+                by_id[transaction_id] = transaction
+                by_user.setdefault(user_id, {})[transaction_id] = None
+                by_status.setdefault(status, {})[transaction_id] = None
+    
+    def get(self, transaction_id):
+        """Get a transaction by ID"""
+        return self._by_id.get(transaction_id)
+    
+    def update(self, transaction_id, status, reference=None):
+        """Change a transaction's status, and reference if given"""
+        with self._lock:
+            transaction = self._by_id.get(transaction_id)
+            if transaction is None:
+                return False
+            self._unindex(transaction)
+            transaction['status'] = status
+            if reference:
+                transaction['reference'] = reference
+            self._index(transaction)
+            return True
+    
+    def for_user(self, user_id):
+        """Get a user's transactions in the order they were added"""
+        with self._lock:
+            return [self._by_id[transaction_id] for transaction_id in self._by_user.get(user_id, ())]
+    
+    def with_status(self, status):
+        """Get the transactions that have a status"""
+        with self._lock:
+            return [self._by_id[transaction_id] for transaction_id in self._by_status.get(status, ())]
+    
+    def clear(self):
+        with self._lock:
+            self._by_id.clear()
+            self._by_user.clear()
+            self._by_status.clear()
+    
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._by_id.values()))
+    
+    def __len__(self):
+        return len(self._by_id)
+
+
+if config.STORAGE_BACKEND == 'sqlite':
+    # SQLite database shared by all worker processes on the host
+    from storage import SQLiteStorage
+    
+    storage = SQLiteStorage(
+        config.STORAGE_PATH,
+        batch_size=config.STORAGE_BATCH_SIZE,
+        flush_interval=config.STORAGE_FLUSH_INTERVAL
+    )
+    users_db = storage.users
+    transactions_db = storage.transactions
+else:
+    # In-memory user database (only used for session storage, not persistent)
+    users_db = UserStore(
+        max_entries=config.USER_STORE_MAX_ENTRIES,
+        max_bytes=config.USER_STORE_MAX_BYTES,
+        idle_ttl=config.USER_STORE_IDLE_TTL
+    )
+    
+    # In-memory transactions database, made durable by the journal if one is configured
+    transactions_db = TransactionStore()
+
+# Journal of transaction changes, replayed on startup (SQLite is durable on its own)
+journal = None
+if config.JOURNAL_PATH and config.STORAGE_BACKEND != 'sqlite':
+    from journal import TransactionJournal
+    
+    journal = TransactionJournal(
+        config.JOURNAL_PATH,
+        fsync_interval=config.JOURNAL_FSYNC_INTERVAL,
+        fsync_batch=config.JOURNAL_FSYNC_BATCH,
+        compact_bytes=config.JOURNAL_COMPACT_BYTES
+    )
+    journal.replay(transactions_db)
 
 # Helper functions
 def get_user_data(username):
-    """Get a user from the session storage"""
+    """Get a user from the session storage, None if unknown or evicted"""
     return users_db.get(username)
 
 def user_exists(username):
@@ -18,28 +249,33 @@ def user_exists(username):
 
 def create_user_session(username, user_data):
     """Create or update a user session"""
-    users_db[username] = user_data
+    users_db[username] = User.from_dict(user_data)
 
 def get_transaction(transaction_id):
     """Get a transaction from the session storage"""
-    for transaction in transactions_db:
-        if transaction.get('transaction_id') == transaction_id:
-            return transaction
-    return None
+    return transactions_db.get(transaction_id)
 
 def add_transaction(transaction_data):
     """Add a transaction to the session storage"""
-    transactions_db.append(transaction_data)
+    transaction = Transaction.from_dict(transaction_data)
+    transactions_db.add(transaction)
+    if journal:
+        journal.record_add(transaction)
 
 def update_transaction(transaction_id, status, reference=None):
     """Update a transaction in the session storage"""
-    for transaction in transactions_db:
-        if transaction.get('transaction_id') == transaction_id:
-            transaction['status'] = status
-            if reference:
-                transaction['reference'] = reference
-            return True
-    return False
+    updated = transactions_db.update(transaction_id, status, reference)
+    if updated and journal:
+        journal.record_update(transaction_id, status, reference)
+    return updated
+
+def get_user_transactions(user_id):
+    """Get a user's transactions from the session storage"""
+    return transactions_db.for_user(user_id)
+
+def get_pending_transactions():
+    """Get the transactions still waiting for payment"""
+    return transactions_db.with_status('Pending')
 
 def clear_session():
     """Clear all session data"""
@@ -0,0 +1,121 @@
+import hashlib
+import threading
+import time
+import types
+from functools import wraps
+
+from flask import make_response, request, session
+
+import config
+from cache import MISSING, TTLCache
+
+
+def config_fingerprint():
+    """Hash the settings in config, so that cached pages can be tied to them"""
+    settings = sorted(
+        (name, repr(value)) for name, value in vars(config).items()
+        if not name.startswith('_') and not isinstance(value, (types.ModuleType, types.FunctionType))
+    )
+    return hashlib.blake2b(repr(settings).encode(), digest_size=16).hexdigest()
+
+
+class _Page:
+    """A rendered page and the config it was rendered with"""
+    
+    __slots__ = ('body', 'mimetype', 'etag', 'fingerprint')
+    
+    def __init__(self, body, mimetype, fingerprint):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.fingerprint = fingerprint
+
+
+class PageCache:
+    """Whole-response cache for pages that look the same to every anonymous visitor
+    
+    A cached view is served from the cache on GET and HEAD when the visitor
+    has an empty session, so nobody is logged in and no messages are waiting
+    to be flashed. Responses are cached by path, only when they are a 200 and
+    leave the session untouched. They carry an ETag, so revalidating browsers
+    get a 304. The config is hashed at most every check_interval seconds and
+    any change drops every cached page.
+    """
+    
+    def __init__(self, maxsize=64, ttl=300, check_interval=1):
+        """Initialize the cache with a maximum page count, a TTL and a config check interval"""
+        self.pages = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._fingerprint = config_fingerprint()
+        self._checked_at = time.monotonic()
+        self.invalidations = 0
+        self.not_modified = 0
+    
+    def fingerprint(self):
+        """Get the current config fingerprint, clearing the cache if it changed"""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._fingerprint
+        
+        with self._lock:
+            if now - self._checked_at >= self.check_interval:
+                fingerprint = config_fingerprint()
+                if fingerprint != self._fingerprint:
+                    self.pages.clear()
+                    self.invalidations += 1
+                    self._fingerprint = fingerprint
+                self._checked_at = now
+            return self._fingerprint
+    
+    def _respond(self, page):
+        response = make_response(page.body)
+        response.mimetype = page.mimetype
+        response.set_etag(page.etag)
+        response.headers['Cache-Control'] = 'no-cache'  # Browsers revalidate with If-None-Match
+        response.vary.add('Cookie')  # A logged in visitor gets a different page
+        response.make_conditional(request)
+        if response.status_code == 304:
+            self.not_modified += 1
+        return response
+    
+    def cached(self, view):
+        """Decorate a view whose anonymous GET response can be shared"""
+        @wraps(view)
+        def decorated_function(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or session:
+                return view(*args, **kwargs)
+            
+            fingerprint = self.fingerprint()
+            page = self.pages.get(request.path)
+            if page is not MISSING and page.fingerprint == fingerprint:
+                return self._respond(page)
+            
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or session or session.modified or 'Set-Cookie' in response.headers:
+                return response
+            
+            page = _Page(response.get_data(), response.mimetype, fingerprint)
+            self.pages.set(request.path, page)
+            return self._respond(page)
+        
+        return decorated_function
+    
+    def clear(self):
+        """Drop every cached page"""
+        self.pages.clear()
+    
+    def stats(self):
+        """Get the page cache counters"""
+        stats = self.pages.stats()
+        stats['not_modified'] = self.not_modified
+        stats['invalidations'] = self.invalidations
+        return stats
+
+
+# Cache for the public pages
+page_cache = PageCache(
+    maxsize=config.PAGE_CACHE_MAXSIZE,
+    ttl=config.PAGE_CACHE_TTL,
+    check_interval=config.PAGE_CACHE_CHECK_INTERVAL
+)
@@ -0,0 +1,225 @@
+import datetime
+import fcntl
+import heapq
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from api_client import api_client
+from ledger import quota_ledger
+import models
+
+# Backend payment states that will not change any more
+COMPLETED_STATES = {'completed', 'success', 'paid'}
+FAILED_STATES = {'failed', 'cancelled', 'canceled', 'expired', 'rejected'}
+
+
+class PaymentPoller:
+    """Polls pending payments in the background until they reach a final state
+    
+    Each checkout is polled with exponential backoff and jitter, and at most
+    max_concurrency status calls run at once across all checkouts. The cost
+    therefore grows with the number of pending payments, not with page views.
+    A checkout still pending after max_attempts polls is marked Expired.
+    
+    Stored Pending payments that nothing polls, like those restored from
+    the journal, are picked up when the poller starts and again every
+    rescan_interval seconds, and those older than expire_after are marked
+    Expired instead. When workers share the store, only the worker holding
+    the lock file at lock_path rescans it, so each stored payment is polled
+    by at most that worker and the one that created it.
+    """
+    
+    def __init__(self, client, max_concurrency=4, base_delay=5, max_delay=120, max_attempts=30,
+                 rescan_interval=900, expire_after=3600, lock_path=None):
+        """Initialize the poller with the backend client and backoff settings"""
+        self.client = client
+        self.max_concurrency = max_concurrency
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.rescan_interval = rescan_interval
+        self.expire_after = expire_after
+        self.lock_path = lock_path
+        self._lock_fd = None
+        
+        self._cond = threading.Condition()
+        self._queue = []  # (due time, checkout_id) heap
+        self._attempts = {}  # checkout_id -> polls made so far
+        self._in_flight = 0
+        self._pid = None
+        self._executor = None
+        self.polls = 0
+        self.settled = 0
+        self.expired = 0
+    
+    def start(self):
+        """Start polling in this process, if not started already, and pick up stored pending payments"""
+        with self._cond:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._queue = []
+            self._attempts = {}
+            self._in_flight = 0
+            self._lock_fd = None  # A lock inherited from the parent is not this worker's
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix='payment-poller'
+            )
+            thread = threading.Thread(target=self._dispatch, name='payment-poller', daemon=True)
+            thread.start()
+            if self.rescan_interval > 0:
+                thread = threading.Thread(target=self._rescan_loop, name='payment-poller-rescan', daemon=True)
+                thread.start()
+        
+        self.rescan()
+    
+    def _owns_rescan(self):
+        """Whether this worker rescans the store, taking the lock file if it is free"""
+        if not self.lock_path or self._lock_fd is not None:
+            return True
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)  # Held until the worker exits
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+    
+    def _is_stale(self, transaction):
+        """Whether a payment was made more than expire_after seconds ago"""
+        try:
+            made = datetime.datetime.strptime(transaction.get('date') or '', '%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            return False
+        return (datetime.datetime.now() - made).total_seconds() > self.expire_after
+    
+    def _expire(self, checkout_id):
+        models.update_transaction(checkout_id, 'Expired')
+        with self._cond:
+            self.expired += 1
+    
+    def rescan(self):
+        """Track the stored Pending payments, or expire them once stale, if this worker owns the scan"""
+        if not self._owns_rescan():
+            return
+        for transaction in models.get_pending_transactions():
+            if self._is_stale(transaction):
+                self._expire(transaction['transaction_id'])
+            else:
+                self.track(transaction['transaction_id'])
+    
+    def _rescan_loop(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.rescan_interval)
+            self.rescan()
+    
+    def _backoff(self, attempts):
+        """Delay before the next poll: exponential, capped, with jitter"""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempts))
+        return delay / 2 + random.uniform(0, delay / 2)
+    
+    def track(self, checkout_id):
+        """Start polling a checkout, if it is not tracked already"""
+        self.start()  # Only starts anything in a newly forked worker
+        with self._cond:
+            if checkout_id in self._attempts:
+                return
+            self._attempts[checkout_id] = 0
+            heapq.heappush(self._queue, (time.monotonic() + self._backoff(0), checkout_id))
+            self._cond.notify()
+    
+    def _dispatch(self):
+        """Hand due checkouts to the worker pool without exceeding the concurrency limit"""
+        while True:
+            with self._cond:
+                while True:
+                    if self._in_flight < self.max_concurrency and self._queue:
+                        wait = self._queue[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                
+                _, checkout_id = heapq.heappop(self._queue)
+                self._in_flight += 1
+            self._executor.submit(self._poll, checkout_id)
+    
+    def _poll(self, checkout_id):
+        """Check one checkout and record the outcome"""
+        status = None
+        expired = False
+        try:
+            success, response = self.client.get_payment_status(checkout_id)
+            if success and isinstance(response, dict):
+                status = str(response.get('status', '')).lower()
+                if status in COMPLETED_STATES or status in FAILED_STATES:
+                    self._settle(checkout_id, status, response)
+        finally:
+            with self._cond:
+                self.polls += 1
+                self._in_flight -= 1
+                attempts = self._attempts.get(checkout_id, 0) + 1
+                
+                if status in COMPLETED_STATES or status in FAILED_STATES:
+                    self._attempts.pop(checkout_id, None)
+                    self.settled += 1
+                elif attempts >= self.max_attempts:
+                    self._attempts.pop(checkout_id, None)
+                    expired = True
+                else:
+                    self._attempts[checkout_id] = attempts
+                    heapq.heappush(self._queue, (time.monotonic() + self._backoff(attempts), checkout_id))
+                self._cond.notify()
+            if expired:
+                self._expire(checkout_id)  # Final, so rescans do not poll it again
+    
+    def _settle(self, checkout_id, status, response):
+        """Store the final state of a payment"""
+        completed = status in COMPLETED_STATES
+        models.update_transaction(
+            checkout_id,
+            'Completed' if completed else status.capitalize(),
+            response.get('reference')
+        )
+        
+        transaction = models.get_transaction(checkout_id)
+        if completed and transaction:
+            username = transaction.get('user_id')
+            user_data = models.get_user_data(username)
+            if user_data:
+                user_data['payment_status'] = 'Paid'
+                models.create_user_session(username, user_data)
+            self.client.invalidate_user(username)
+            quota_ledger.refresh(username)  # The payment's words are usable right away
+    
+    def stats(self):
+        """Get poller counters"""
+        with self._cond:
+            return {
+                'tracked': len(self._attempts),
+                'in_flight': self._in_flight,
+                'polls': self.polls,
+                'settled': self.settled,
+                'expired': self.expired
+            }
+
+# Create a poller instance
+payment_poller = PaymentPoller(
+    api_client,
+    max_concurrency=config.PAYMENT_POLL_CONCURRENCY,
+    base_delay=config.PAYMENT_POLL_BASE_DELAY,
+    max_delay=config.PAYMENT_POLL_MAX_DELAY,
+    max_attempts=config.PAYMENT_POLL_MAX_ATTEMPTS,
+    rescan_interval=config.PAYMENT_POLL_RESCAN_INTERVAL,
+    expire_after=config.PAYMENT_POLL_EXPIRE_AFTER,
+    # Workers only share pending payments through the journal or SQLite
+    lock_path=config.PAYMENT_POLL_LOCK_PATH if models.journal or config.STORAGE_BACKEND == 'sqlite' else None
+)
@@ -0,0 +1,111 @@
+# Compact record types for users and transactions kept in session storage
+import sys
+
+_MISSING = object()
+
+
+class Record:
+    """Base for slotted records that also behave like the dicts they replace
+    
+    Known fields live in __slots__ and unknown backend fields in a small
+    extra dict, so records round-trip through backend JSON unchanged. Code
+    written for dicts (get, [], in) keeps working, and an unset field
+    behaves like a missing key. Values of INTERNED fields are interned, so
+    every record with the same plan or status shares one string.
+    """
+    
+    __slots__ = ('extra',)
+    FIELDS = ()
+    INTERNED = frozenset()
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+    
+    def __init__(self, **fields):
+        self._load(fields)
+    
+    def _load(self, data):
+        self.extra = None
+        field_set = self._field_set
+        interned = self.INTERNED
+        for key, value in data.items():
+            if key in interned and type(value) is str:
+                value = sys.intern(value)
+            if key in field_set:
+                setattr(self, key, value)
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[key] = value
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a dict such as a backend JSON object"""
+        if isinstance(data, cls):
+            return data
+        record = cls.__new__(cls)
+        record._load(data)
+        return record
+    
+    def to_dict(self):
+        """Convert the record back to a plain dict for JSON"""
+        data = {}
+        for key in self.FIELDS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                data[key] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+    
+    def get(self, key, default=None):
+        if key in self._field_set:
+            value = getattr(self, key, _MISSING)
+            return default if value is _MISSING else value
+        return self.extra.get(key, default) if self.extra else default
+    
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+    
+    def __setitem__(self, key, value):
+        if key in self.INTERNED and type(value) is str:
+            value = sys.intern(value)
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+    
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+    
+    def __eq__(self, other):
+        if isinstance(other, Record):
+            other = other.to_dict()
+        return self.to_dict() == other
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class User(Record):
+    """A user kept in session storage"""
+    
+    FIELDS = ('username', 'words_remaining', 'phone_number', 'plan', 'payment_status', 'created_at')
+    INTERNED = frozenset(('plan', 'payment_status'))
+    __slots__ = FIELDS
+
+
+class Transaction(Record):
+    """A payment transaction kept in session storage"""
+    
+    FIELDS = ('transaction_id', 'user_id', 'phone_number', 'amount', 'subscription_type', 'date', 'status', 'reference')
+    INTERNED = frozenset(('subscription_type', 'status'))
+    __slots__ = FIELDS
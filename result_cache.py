@@ -0,0 +1,103 @@
+import copy
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+import config
+from cache import MISSING
+from sizing import approximate_size
+
+# Runs of whitespace, which the detect scores do not depend on
+_WHITESPACE = re.compile(r'\s+')
+
+
+class ResultCache:
+    """LRU cache of tool results, bounded by bytes and keyed by input content
+    
+    Keys are a BLAKE2b digest of the kind of result, its parameters and the
+    text, so resubmitting the same text from any account finds the earlier
+    result. Whitespace runs are only collapsed for results that do not
+    depend on them, the humanized text keeps the input's line breaks.
+    Results are evicted least recently used first once their approximate
+    size passes max_bytes. Each hit adds the length of the input it spared
+    processing to bytes_saved.
+    """
+    
+    def __init__(self, max_bytes=32 * 2 ** 20):
+        """Initialize the cache with a size limit in bytes, 0 disables it"""
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # key -> (result, size, input bytes), oldest first
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+    
+    @staticmethod
+    def key(kind, text, *params, collapse_whitespace=False):
+        """Get the content address of a result"""
+        if collapse_whitespace:
+            text = _WHITESPACE.sub(' ', text).strip()
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((kind,) + params).encode())
+        digest.update(b'\0')
+        digest.update(text.encode('utf-8', 'surrogatepass'))
+        return digest.digest()
+    
+    def get(self, key):
+        """Get a copy of a cached result and mark it as recently used"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self._data.move_to_end(key)
+            self.hits += 1
+            self.bytes_saved += entry[2]
+            result = entry[0]
+        return copy.deepcopy(result)  # Callers may modify what they get back
+    
+    def set(self, key, result, input_bytes):
+        """Cache a result, evicting the least recently used ones if over the limit"""
+        size = approximate_size(result) + len(key)
+        if size > self.max_bytes:
+            return
+        
+        result = copy.deepcopy(result)
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._data[key] = (result, size, input_bytes)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+    
+    def clear(self):
+        """Remove all results"""
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+    
+    def stats(self):
+        """Get the hit ratio, size and bytes of input saved"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'bytes_saved': self.bytes_saved
+            }
+
+
+# Results of /detect and /humanize
+result_cache = ResultCache(max_bytes=config.RESULT_CACHE_MAX_BYTES)
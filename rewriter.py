@@ -0,0 +1,116 @@
+import re
+
+import config
+
+
+def _trie_pattern(node, groups=None):
+    """Turn a character trie into a regex that prefers the longest phrase
+    
+    With groups, a dict of phrase -> group name, the end of each phrase is
+    marked with an empty named group, so match.lastgroup tells which one
+    matched.
+    """
+    terminal = '' in node
+    named = groups is not None
+    marker = f"(?P<{groups[node['']]}>)" if terminal and named else ''
+    branches = []
+    for char in sorted(key for key in node if key):
+        fragment = r'\s+' if char == ' ' else re.escape(char)
+        branches.append(fragment + _trie_pattern(node[char], groups))
+
+    if not branches:
+        return marker
+    if len(branches) == 1:
+        pattern = branches[0]
+    else:
+        pattern = '(?:' + '|'.join(branches) + ')'
+    if terminal:
+        # Greedy, so a longer phrase wins over its prefix
+        pattern = '(?:' + pattern + '|' + marker + ')' if named else '(?:' + pattern + ')?'
+    return pattern
+
+
+def _match_case(replacement, matched):
+    """Give a replacement the capitalization of the text it replaces"""
+    if matched.isupper() and len(matched) > 1:
+        return replacement.upper()
+    if matched[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    if replacement[1:2].isupper():
+        return replacement  # An acronym or a proper name
+    return replacement[:1].lower() + replacement[1:]
+
+
+class PhraseRewriter:
+    """Replaces many phrases in a single pass over the text
+    
+    The phrases are compiled once into one regex over a trie of their
+    characters, so the cost of a scan grows with the text and hardly with
+    the number of phrases. The text is scanned left to right, and where several phrases
+    start at the same place the longest one is replaced. Phrases only match
+    whole words, any run of whitespace matches a space, and matching ignores
+    case. Each replacement takes the capitalization of the text it replaces.
+    
+    Text whose lowercase differs in length, like 'İ', is matched with
+    re.IGNORECASE instead. Its simple case folding can disagree with
+    str.lower(), so there each phrase is told by an empty group at its end.
+    """
+    
+    def __init__(self, phrases):
+        """Initialize the rewriter with a dict of phrase -> replacement"""
+        self.replacements = {}
+        trie = {}
+        for phrase, replacement in phrases.items():
+            key = self._key(phrase)
+            if not key:
+                continue
+            self.replacements[key] = replacement
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[''] = key
+        
+        self.pattern = None
+        self.folded_pattern = None  # Compiled on first use, few texts need it
+        self.group_keys = {}  # Group name in folded_pattern -> phrase key
+        if self.replacements:
+            groups = {key: f'p{index}' for index, key in enumerate(self.replacements)}
+            self.group_keys = {name: key for key, name in groups.items()}
+            self.pattern = re.compile(r'(?<!\w)' + _trie_pattern(trie) + r'(?!\w)')  # Run over the lowercased text
+            self._folded_source = r'(?<!\w)' + _trie_pattern(trie, groups) + r'(?!\w)'
+    
+    @staticmethod
+    def _key(phrase):
+        return ' '.join(phrase.split()).lower()
+    
+    def _replace_folded(self, match):
+        matched = match.group()
+        return _match_case(self.replacements[self.group_keys[match.lastgroup]], matched)
+    
+    def rewrite(self, text):
+        """Replace every phrase in the text"""
+        if self.pattern is None:
+            return text
+        
+        # Scanning a lowercased copy is about twice as fast as an IGNORECASE
+        # pattern, but only maps back onto the text if no character changed length
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            if self.folded_pattern is None:
+                self.folded_pattern = re.compile(self._folded_source, re.IGNORECASE)
+            return self.folded_pattern.sub(self._replace_folded, text)
+        
+        pieces = []
+        position = 0
+        for match in self.pattern.finditer(lowered):
+            start, end = match.span()
+            replacement = self.replacements[self._key(match.group())]
+            pieces.append(text[position:start])
+            pieces.append(_match_case(replacement, text[start:end]))
+            position = end
+        pieces.append(text[position:])
+        return ''.join(pieces)
+
+
+# Rewriter for the humanizer's phrase dictionary
+phrase_rewriter = PhraseRewriter(config.humanize_phrases)
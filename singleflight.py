@@ -0,0 +1,73 @@
+import threading
+
+
+class _Call:
+    """An upstream call that other callers can wait on"""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one upstream call
+    
+    The first caller for a key runs the function; callers that arrive while
+    it is running wait for it and receive the same result.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.collapsed = 0
+    
+    def do(self, key, fn):
+        """Run fn for key, or wait for the call already running
+        
+        Returns (result, shared), where shared is True for callers that
+        received another caller's result.
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self.collapsed += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
+        return call.result, False
+    
+    def forget(self, key):
+        """Make later callers start a new call instead of joining a running one"""
+        with self._lock:
+            self._calls.pop(key, None)
+    
+    def stats(self):
+        """Get call and collapse counters"""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'collapsed': self.collapsed,
+                'in_flight': len(self._calls)
+            }
@@ -0,0 +1,21 @@
+# Memory estimates for the caches and stores that are bounded in bytes
+import sys
+
+from records import Record
+
+
+def approximate_size(value):
+    """Estimate the memory held by a JSON-like value, in bytes"""
+    size = sys.getsizeof(value)
+    if isinstance(value, Record):
+        for key in value.FIELDS:
+            size += approximate_size(value.get(key))
+        if value.extra:
+            size += approximate_size(value.extra)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            size += approximate_size(key) + approximate_size(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += approximate_size(item)
+    return size
@@ -0,0 +1,628 @@
+# Stylesheet and script served through the asset pipeline
+
+# Site stylesheet
+stylesheet = """
+    /* Reset and base styles */
+    * {
+        margin: 0;
+        padding: 0;
+        box-sizing: border-box;
+    }
+    
+    body {
+        font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+        line-height: 1.6;
+        color: #333;
+        background-color: #f9f9f9;
+    }
+    
+    a {
+        color: #0066cc;
+        text-decoration: none;
+    }
+    
+    a:hover {
+        text-decoration: underline;
+    }
+    
+    /* Layout */
+    .container {
+        max-width: 1200px;
+        margin: 0 auto;
+        padding: 20px;
+    }
+    
+    header {
+        background-color: #fff;
+        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
+    }
+    
+    .header-container {
+        display: flex;
+        justify-content: space-between;
+        align-items: center;
+        max-width: 1200px;
+        margin: 0 auto;
+        padding: 20px;
+    }
+    
+    .logo a {
+        font-size: 1.5rem;
+        font-weight: bold;
+        color: #333;
+    }
+    
+    nav ul {
+        display: flex;
+        list-style: none;
+    }
+    
+    nav ul li {
+        margin-left: 20px;
+    }
+    
+    main {
+        min-height: calc(100vh - 160px);
+        padding: 40px 0;
+    }
+    
+    footer {
+        background-color: #333;
+        color: #fff;
+        padding: 20px 0;
+        text-align: center;
+    }
+    
+    /* Form styles */
+    .form-group {
+        margin-bottom: 20px;
+    }
+    
+    label {
+        display: block;
+        margin-bottom: 5px;
+        font-weight: 600;
+    }
+    
+    input, select, textarea {
+        width: 100%;
+        padding: 10px;
+        border: 1px solid #ddd;
+        border-radius: 4px;
+        font-size: 1rem;
+    }
+    
+    textarea {
+        min-height: 150px;
+        resize: vertical;
+    }
+    
+    .form-actions {
+        margin-top: 30px;
+    }
+    
+    /* Button styles */
+    .button {
+        display: inline-block;
+        padding: 10px 20px;
+        background-color: #0066cc;
+        color: #fff;
+        border: none;
+        border-radius: 4px;
+        cursor: pointer;
+        font-size: 1rem;
+        text-align: center;
+    }
+    
+    .button:hover {
+        background-color: #0052a3;
+        text-decoration: none;
+    }
+    
+    .button.primary {
+        background-color: #0066cc;
+    }
+    
+    .button.secondary {
+        background-color: #666;
+    }
+    
+    /* Flash messages */
+    .flash-messages {
+        margin-bottom: 20px;
+    }
+    
+    .flash {
+        padding: 10px 15px;
+        margin-bottom: 10px;
+        border-radius: 4px;
+    }
+    
+    .flash.success {
+        background-color: #dff0d8;
+        color: #3c763d;
+        border: 1px solid #d6e9c6;
+    }
+    
+    .flash.error {
+        background-color: #f2dede;
+        color: #a94442;
+        border: 1px solid #ebccd1;
+    }
+    
+    .flash.info {
+        background-color: #d9edf7;
+        color: #31708f;
+        border: 1px solid #bce8f1;
+    }
+    
+    .flash.warning {
+        background-color: #fcf8e3;
+        color: #8a6d3b;
+        border: 1px solid #faebcc;
+    }
+    
+    /* Hero section */
+    .hero {
+        text-align: center;
+        padding: 60px 0;
+    }
+    
+    .hero h1 {
+        font-size: 2.5rem;
+        margin-bottom: 20px;
+    }
+    
+    .hero p {
+        font-size: 1.2rem;
+        margin-bottom: 30px;
+    }
+    
+    .cta-buttons {
+        display: flex;
+        justify-content: center;
+        gap: 20px;
+    }
+    
+    /* Features section */
+    .features {
+        padding: 60px 0;
+        background-color: #fff;
+    }
+    
+    .features h2 {
+        text-align: center;
+        margin-bottom: 40px;
+    }
+    
+    .feature-list {
+        display: flex;
+        gap: 30px;
+    }
+    
+    .feature {
+        flex: 1;
+        padding: 20px;
+        border-radius: 4px;
+        background-color: #f9f9f9;
+        text-align: center;
+    }
+    
+    .feature h3 {
+        margin-bottom: 15px;
+    }
+    
+    /* Pricing section */
+    .pricing {
+        padding: 60px 0;
+    }
+    
+    .pricing h2 {
+        text-align: center;
+        margin-bottom: 40px;
+    }
+    
+    .pricing-cards {
+        display: flex;
+        gap: 30px;
+        justify-content: center;
+    }
+    
+    .pricing-card {
+        flex: 1;
+        max-width: 300px;
+        padding: 30px;
+        border-radius: 4px;
+        background-color: #fff;
+        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
+        text-align: center;
+    }
+    
+    .pricing-card h3 {
+        margin-bottom: 15px;
+    }
+    
+    .pricing-card .price {
+        font-size: 2rem;
+        font-weight: bold;
+        margin-bottom: 20px;
+    }
+    
+    .pricing-card ul {
+        margin-bottom: 30px;
+        list-style: none;
+    }
+    
+    .pricing-card ul li {
+        margin-bottom: 10px;
+    }
+    
+    /* Auth forms */
+    .auth-form {
+        max-width: 500px;
+        margin: 0 auto;
+        padding: 30px;
+        background-color: #fff;
+        border-radius: 4px;
+        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
+    }
+    
+    .auth-form h1 {
+        margin-bottom: 30px;
+        text-align: center;
+    }
+    
+    .auth-form p {
+        text-align: center;
+        margin-top: 20px;
+    }
+    
+    /* Dashboard */
+    .dashboard h1 {
+        margin-bottom: 30px;
+    }
+    
+    .dashboard-cards {
+        display: flex;
+        gap: 30px;
+        margin-bottom: 40px;
+    }
+    
+    .dashboard-card {
+        flex: 1;
+        padding: 30px;
+        background-color: #fff;
+        border-radius: 4px;
+        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
+    }
+    
+    .dashboard-card h2 {
+        margin-bottom: 20px;
+    }
+    
+    .big-number {
+        font-size: 3rem;
+        font-weight: bold;
+        margin-bottom: 20px;
+        color: #0066cc;
+    }
+    
+    .action-links {
+        display: flex;
+        flex-direction: column;
+        gap: 10px;
+    }
+    
+    .action-link {
+        padding: 10px;
+        background-color: #f9f9f9;
+        border-radius: 4px;
+        text-align: center;
+    }
+    
+    /* Tool pages */
+    .tool-page {
+        max-width: 800px;
+        margin: 0 auto;
+    }
+    
+    .tool-page h1 {
+        margin-bottom: 30px;
+    }
+    
+    .tool-page p {
+        margin-bottom: 20px;
+    }
+    
+    .result-message {
+        margin: 30px 0;
+        padding: 15px;
+        background-color: #f9f9f9;
+        border-radius: 4px;
+    }
+    
+    .result-box {
+        margin-top: 30px;
+        padding: 20px;
+        background-color: #fff;
+        border-radius: 4px;
+        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
+    }
+    
+    .result-box h2 {
+        margin-bottom: 20px;
+    }
+    
+    .result-content {
+        margin-bottom: 20px;
+        padding: 15px;
+        background-color: #f9f9f9;
+        border-radius: 4px;
+        white-space: pre-wrap;
+    }
+    
+    /* Score display */
+    .score-display {
+        margin: 20px 0;
+    }
+    
+    .score-bar {
+        height: 40px;
+        border-radius: 4px;
+        overflow: hidden;
+        display: flex;
+    }
+    
+    .score-fill {
+        height: 100%;
+        display: flex;
+        align-items: center;
+        justify-content: center;
+        color: #fff;
+        font-weight: bold;
+    }
+    
+    .score-fill.human {
+        background-color: #0066cc;
+    }
+    
+    .score-fill.ai {
+        background-color: #cc0000;
+    }
+    
+    /* Account page */
+    .account-page h1, .account-page h2 {
+        margin-bottom: 30px;
+    }
+    
+    .account-info {
+        margin-bottom: 40px;
+    }
+    
+    .info-card {
+        padding: 30px;
+        background-color: #fff;
+        border-radius: 4px;
+        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
+    }
+    
+    .info-card p {
+        margin-bottom: 15px;
+    }
+    
+    .account-actions {
+        display: flex;
+        gap: 20px;
+        margin-bottom: 40px;
+    }
+    
+    /* Payment-required message */
+    .payment-required {
+        padding: 30px;
+        background-color: #f9f9f9;
+        border-radius: 4px;
+        text-align: center;
+        margin-bottom: 30px;
+    }
+    
+    .payment-required p {
+        margin-bottom: 20px;
+    }
+    
+    /* Status indicators */
+    .status {
+        display: inline-block;
+        padding: 3px 8px;
+        border-radius: 4px;
+        font-size: 0.9rem;
+    }
+    
+    .status.success {
+        background-color: #dff0d8;
+        color: #3c763d;
+    }
+    
+    .status.warning {
+        background-color: #fcf8e3;
+        color: #8a6d3b;
+    }
+    
+    /* Tables */
+    .table-container {
+        overflow-x: auto;
+    }
+    
+    .data-table {
+        width: 100%;
+        border-collapse: collapse;
+    }
+    
+    .data-table th, .data-table td {
+        padding: 10px;
+        text-align: left;
+        border-bottom: 1px solid #ddd;
+    }
+    
+    .data-table th {
+        background-color: #f9f9f9;
+        font-weight: 600;
+    }
+    
+    /* Payment page */
+    .payment-page, .upgrade-page {
+        max-width: 600px;
+        margin: 0 auto;
+    }
+    
+    .plan-details {
+        margin-bottom: 30px;
+        padding: 20px;
+        background-color: #f9f9f9;
+        border-radius: 4px;
+    }
+    
+    /* Plan selection */
+    .current-plan {
+        margin-bottom: 40px;
+    }
+    
+    .plan-options {
+        display: flex;
+        gap: 20px;
+        margin-bottom: 30px;
+    }
+    
+    .plan-option {
+        flex: 1;
+    }
+    
+    .plan-option input[type="radio"] {
+        display: none;
+    }
+    
+    .plan-option label {
+        display: block;
+        cursor: pointer;
+    }
+    
+    .plan-card {
+        padding: 20px;
+        background-color: #fff;
+        border-radius: 4px;
+        box-shadow: 0 2px 10px rgba(0, 0, 0, 0.1);
+        text-align: center;
+        transition: transform 0.2s;
+    }
+    
+    .plan-card.current {
+        border: 2px solid #0066cc;
+    }
+    
+    .plan-option input[type="radio"]:checked + label .plan-card {
+        border: 2px solid #0066cc;
+        transform: scale(1.05);
+    }
+    
+    /* Analysis details */
+    .analysis-details {
+        margin-top: 20px;
+    }
+    
+    .analysis-details h3 {
+        margin-bottom: 15px;
+    }
+    
+    .analysis-details ul {
+        list-style: none;
+    }
+    
+    .analysis-details ul li {
+        margin-bottom: 10px;
+    }
+    
+    /* Media queries */
+    @media (max-width: 768px) {
+        .header-container {
+            flex-direction: column;
+            padding: 10px;
+        }
+        
+        .logo {
+            margin-bottom: 10px;
+        }
+        
+        nav ul {
+            flex-wrap: wrap;
+            justify-content: center;
+        }
+        
+        nav ul li {
+            margin: 5px;
+        }
+        
+        .feature-list, .dashboard-cards, .pricing-cards {
+            flex-direction: column;
+        }
+        
+        .pricing-card {
+            max-width: 100%;
+        }
+        
+        .plan-options {
+            flex-direction: column;
+        }
+    }
+    """
+
+# Site script
+script = """
+    // Notification close
+    document.addEventListener('DOMContentLoaded', function() {
+        // Add close button to flash messages
+        const flashMessages = document.querySelectorAll('.flash');
+        flashMessages.forEach(function(message) {
+            const closeButton = document.createElement('span');
+            closeButton.innerHTML = '&times;';
+            closeButton.className = 'close-button';
+            closeButton.style.float = 'right';
+            closeButton.style.cursor = 'pointer';
+            closeButton.style.marginLeft = '10px';
+            closeButton.onclick = function() {
+                message.style.display = 'none';
+            };
+            message.appendChild(closeButton);
+        });
+        
+        // Load further pages of a table on demand
+        document.querySelectorAll('.load-more').forEach(function(button) {
+            button.addEventListener('click', function() {
+                button.disabled = true;
+                fetch(button.dataset.url + '?page=' + button.dataset.nextPage, {credentials: 'same-origin'})
+                    .then(function(response) {
+                        if (!response.ok) {
+                            throw new Error('Failed to load more rows');
+                        }
+                        const nextPage = response.headers.get('X-Next-Page');
+                        return response.text().then(function(html) {
+                            document.getElementById(button.dataset.target).insertAdjacentHTML('beforeend', html);
+                            if (nextPage) {
+                                button.dataset.nextPage = nextPage;
+                                button.disabled = false;
+                            } else {
+                                button.parentNode.removeChild(button);
+                            }
+                        });
+                    })
+                    .catch(function() {
+                        button.disabled = false;
+                    });
+            });
+        });
+    });
+    """
+
+# All assets by name
+assets = {
+    'style.css': stylesheet,
+    'script.js': script
+}
@@ -0,0 +1,270 @@
+# SQLite storage shared by every worker process on a host
+import atexit
+import json
+import os
+import sqlite3
+import threading
+
+from records import Transaction, User
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    transaction_id TEXT UNIQUE NOT NULL,
+    user_id TEXT,
+    status TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_user_id ON transactions (user_id);
+CREATE INDEX IF NOT EXISTS transactions_status ON transactions (status);
+"""
+
+
+class SQLiteStorage:
+    """SQLite database in WAL mode with writes batched per process
+    
+    Readers never block the writer in WAL mode, so every worker reads the
+    file directly. Writes are buffered and committed together, either when
+    batch_size writes are waiting or every flush_interval seconds. Reads in
+    the same process see buffered writes straight away.
+    """
+    
+    def __init__(self, path, batch_size=100, flush_interval=0.05):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._users = {}  # username -> data waiting to be written
+        self._transactions = {}  # transaction_id -> data waiting to be written
+        self._flushing_users = {}  # Writes being committed, still visible to readers
+        self._flushing_transactions = {}
+        self._wake = threading.Event()
+        self._flusher_pid = None
+        self.commits = 0
+        self.rows_written = 0
+        
+        self.users = SQLiteUserStore(self)
+        self.transactions = SQLiteTransactionStore(self)
+        
+        self.connection().executescript(SCHEMA)
+        atexit.register(self.flush)
+    
+    def connection(self):
+        """Return this thread's connection, opening it after a fork if needed"""
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            local.connection = connection
+            local.pid = os.getpid()
+        return local.connection
+    
+    def _start_flusher(self):
+        if self._flusher_pid != os.getpid():
+            self._flusher_pid = os.getpid()
+            thread = threading.Thread(target=self._run_flusher, name='sqlite-flusher', daemon=True)
+            thread.start()
+    
+    def _run_flusher(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"SQLite flush failed, will retry: {e}")
+    
+    def queue_user(self, username, user_data):
+        """Buffer a user write"""
+        with self._lock:
+            self._start_flusher()
+            self._users[username] = json.dumps(User.from_dict(user_data).to_dict())
+            full = len(self._users) + len(self._transactions) >= self.batch_size
+        if full:
+            self._wake.set()
+    
+    def queue_transaction(self, transaction):
+        """Buffer a transaction write"""
+        with self._lock:
+            self._start_flusher()
+            self._transactions[transaction.get('transaction_id')] = Transaction.from_dict(transaction).to_dict()
+            full = len(self._users) + len(self._transactions) >= self.batch_size
+        if full:
+            self._wake.set()
+    
+    def pending_user(self, username):
+        """Get a user write that is not committed yet, or None"""
+        with self._lock:
+            data = self._users.get(username) or self._flushing_users.get(username)
+        return User.from_dict(json.loads(data)) if data is not None else None
+    
+    def pending_transaction(self, transaction_id):
+        """Get a transaction write that is not committed yet, or None"""
+        with self._lock:
+            transaction = self._transactions.get(transaction_id) or self._flushing_transactions.get(transaction_id)
+        return Transaction.from_dict(transaction) if transaction is not None else None
+    
+    def flush(self):
+        """Commit every buffered write in one transaction"""
+        with self._flush_lock:
+            with self._lock:
+                users = self._flushing_users = self._users
+                transactions = self._flushing_transactions = self._transactions
+                self._users, self._transactions = {}, {}
+            if not users and not transactions:
+                return
+            
+            try:
+                self._commit(users, transactions)
+            except Exception:
+                # Put the writes back for the next attempt, unless newer ones replaced them
+                with self._lock:
+                    for username, data in users.items():
+                        self._users.setdefault(username, data)
+                    for transaction_id, transaction in transactions.items():
+                        self._transactions.setdefault(transaction_id, transaction)
+                raise
+            finally:
+                with self._lock:
+                    self._flushing_users, self._flushing_transactions = {}, {}
+    
+    def _commit(self, users, transactions):
+        connection = self.connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.executemany(
+                'INSERT INTO users (username, data) VALUES (?, ?) '
+                'ON CONFLICT (username) DO UPDATE SET data = excluded.data',
+                users.items()
+            )
+            connection.executemany(
+                'INSERT INTO transactions (transaction_id, user_id, status, data) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (transaction_id) DO UPDATE SET '
+                'user_id = excluded.user_id, status = excluded.status, data = excluded.data',
+                [
+                    (transaction_id, t.get('user_id'), t.get('status'), json.dumps(t))
+                    for transaction_id, t in transactions.items()
+                ]
+            )
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        self.commits += 1
+        self.rows_written += len(users) + len(transactions)
+    
+    def query(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchall()
+    
+    def clear(self):
+        with self._flush_lock, self._lock:
+            self._users.clear()
+            self._transactions.clear()
+        connection = self.connection()
+        connection.execute('DELETE FROM users')
+        connection.execute('DELETE FROM transactions')
+
+
+class SQLiteUserStore:
+    """User sessions stored in SQLite, with the same interface as models.UserStore"""
+    
+    def __init__(self, storage):
+        self.storage = storage
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, username, default=None):
+        user_data = self.storage.pending_user(username)
+        if user_data is None:
+            rows = self.storage.query('SELECT data FROM users WHERE username = ?', (username,))
+            user_data = User.from_dict(json.loads(rows[0][0])) if rows else None
+        if user_data is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return user_data
+    
+    def __contains__(self, username):
+        return self.get(username) is not None
+    
+    def __setitem__(self, username, user_data):
+        self.storage.queue_user(username, user_data)
+    
+    def pop(self, username, default=None):
+        user_data = self.get(username, default)
+        self.storage.flush()
+        self.storage.query('DELETE FROM users WHERE username = ?', (username,))
+        return user_data
+    
+    def clear(self):
+        self.storage.clear()
+    
+    def __len__(self):
+        self.storage.flush()
+        return self.storage.query('SELECT COUNT(*) FROM users')[0][0]
+    
+    def stats(self):
+        return {
+            'backend': 'sqlite',
+            'path': self.storage.path,
+            'entries': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'commits': self.storage.commits,
+            'rows_written': self.storage.rows_written
+        }
+
+
+class SQLiteTransactionStore:
+    """Transactions stored in SQLite, with the same interface as models.TransactionStore"""
+    
+    def __init__(self, storage):
+        self.storage = storage
+    
+    def _rows(self, sql, params=()):
+        self.storage.flush()
+        return [Transaction.from_dict(json.loads(data)) for (data,) in self.storage.query(sql, params)]
+    
+    def add(self, transaction):
+        self.storage.queue_transaction(transaction)
+    
+    def get(self, transaction_id):
+        transaction = self.storage.pending_transaction(transaction_id)
+        if transaction is None:
+            rows = self.storage.query('SELECT data FROM transactions WHERE transaction_id = ?', (transaction_id,))
+            transaction = Transaction.from_dict(json.loads(rows[0][0])) if rows else None
+        return transaction
+    
+    def update(self, transaction_id, status, reference=None):
+        transaction = self.get(transaction_id)
+        if transaction is None:
+            return False
+        transaction['status'] = status
+        if reference:
+            transaction['reference'] = reference
+        self.storage.queue_transaction(transaction)
+        return True
+    
+    def for_user(self, user_id):
+        return self._rows('SELECT data FROM transactions WHERE user_id = ? ORDER BY seq', (user_id,))
+    
+    def with_status(self, status):
+        return self._rows('SELECT data FROM transactions WHERE status = ? ORDER BY seq', (status,))
+    
+    def clear(self):
+        self.storage.clear()
+    
+    def __iter__(self):
+        return iter(self._rows('SELECT data FROM transactions ORDER BY seq'))
+    
+    def __len__(self):
+        self.storage.flush()
+        return self.storage.query('SELECT COUNT(*) FROM transactions')[0][0]
@@ -0,0 +1,144 @@
+import numpy as np
+
+# Words that machine-written prose leans on far more than people do
+FORMAL_LEXICON = (
+    'additionally', 'aforementioned', 'comprehensive', 'consequently', 'crucial', 'delve',
+    'demonstrate', 'demonstrates', 'ensure', 'ensuring', 'essential', 'facilitate',
+    'furthermore', 'hence', 'however', 'importantly', 'leverage', 'leveraging', 'moreover',
+    'notably', 'nevertheless', 'overall', 'paramount', 'pivotal', 'robust', 'significant',
+    'significantly', 'subsequently', 'therefore', 'thus', 'ultimately', 'utilize',
+    'utilizing', 'various', 'whereas', 'wherein'
+)
+
+# Characters that continue a word: ASCII letters, digits and apostrophes, and anything non-ASCII
+# outside the whitespace and general punctuation blocks
+_ASCII_WORD = np.zeros(128, dtype=bool)
+for _char in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'":
+    _ASCII_WORD[ord(_char)] = True
+_UNICODE_SPACES = np.array([0x85, 0xa0, 0x1680, 0x2028, 0x2029, 0x202f, 0x205f, 0x3000]
+                           + list(range(0x2000, 0x200b)), dtype=np.uint32)
+_TERMINATORS = np.array([ord('.'), ord('!'), ord('?')], dtype=np.uint32)
+
+_HASH_BASE = np.uint64(1099511628211)
+_NGRAM_BASE = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _clip_percent(value):
+    return int(round(100 * min(max(value, 0.0), 1.0)))
+
+
+class StylometricAnalyzer:
+    """Scores how machine-like a text reads, from statistics computed with NumPy
+    
+    The text is turned into an array of code points once, and everything
+    after that is array arithmetic rather than a loop over words:
+    - sentence uniformity, from the coefficient of variation of sentence
+      lengths in words (people vary theirs more)
+    - repetitive patterns, from the share of word bigrams and trigrams that
+      occur more than once, with words compared by a 64-bit hash
+    - formal language, from the density of words in a formal lexicon
+    Each feature is mapped onto 0-100, and the AI score is their mean.
+    """
+    
+    def __init__(self, formal_lexicon=FORMAL_LEXICON, uniform_cv=0.2, varied_cv=0.8,
+                 repetition_ceiling=0.25, formal_ceiling=0.03):
+        """Initialize the analyzer with a lexicon and the ranges each score spans"""
+        self.uniform_cv = uniform_cv  # Sentence length variation scored 100
+        self.varied_cv = varied_cv  # Sentence length variation scored 0
+        self.repetition_ceiling = repetition_ceiling  # Repeated n-gram share scored 100
+        self.formal_ceiling = formal_ceiling  # Formal word share scored 100
+        self.lexicon_hashes = np.unique(self._word_hashes(' '.join(formal_lexicon))[0])
+    
+    @staticmethod
+    def _code_points(text):
+        return np.frombuffer(text.lower().encode('utf-32-le'), dtype=np.uint32)
+    
+    def _word_hashes(self, text):
+        """Hash every word, returns (hashes, word start positions, code points)"""
+        points = self._code_points(text)
+        if not len(points):
+            empty = np.zeros(0, dtype=np.int64)
+            return empty.astype(np.uint64), empty, points
+        
+        ascii_points = np.minimum(points, 127)
+        is_word = np.where(points < 128, _ASCII_WORD[ascii_points], True)
+        is_word &= ~np.isin(points, _UNICODE_SPACES) & ((points < 0x2000) | (points > 0x206f))
+        
+        starts_mask = is_word.copy()
+        starts_mask[1:] &= ~is_word[:-1]
+        starts = np.flatnonzero(starts_mask)
+        if not len(starts):
+            return np.zeros(0, dtype=np.uint64), starts, points
+        
+        # Polynomial hash of each word: its characters weighted by powers of the base,
+        # by position within the word, summed per word with reduceat
+        word_points = points[is_word].astype(np.uint64)
+        word_starts = np.flatnonzero(starts_mask[is_word])
+        index = np.arange(len(word_points))
+        position = index - np.maximum.accumulate(np.where(starts_mask[is_word], index, 0))
+        powers = np.cumprod(np.full(int(position.max()) + 1, _HASH_BASE, dtype=np.uint64))
+        hashes = np.add.reduceat(word_points * powers[position], word_starts)
+        return hashes, starts, points
+    
+    def features(self, text):
+        """Compute the raw statistics behind the scores"""
+        with np.errstate(over='ignore'):
+            hashes, starts, points = self._word_hashes(text)
+        words = len(hashes)
+        features = {'words': words, 'sentences': 0, 'sentence_cv': None,
+                    'ngram_repetition': 0.0, 'formal_density': 0.0}
+        if not words:
+            return features
+        
+        # Sentence lengths: a terminator followed by whitespace or the end closes a sentence,
+        # and each word belongs to the sentence that the terminators before it put it in
+        terminators = np.isin(points, _TERMINATORS)
+        terminators[:-1] &= (points[1:] <= 32) | np.isin(points[1:], _UNICODE_SPACES)
+        sentence_ids = np.cumsum(terminators)[starts]
+        lengths = np.bincount(sentence_ids)
+        lengths = lengths[lengths > 0].astype(np.float64)
+        features['sentences'] = len(lengths)
+        if len(lengths) > 1:
+            features['sentence_cv'] = float(lengths.std() / lengths.mean())
+        
+        # Share of bigrams and trigrams that are repeats of an earlier one
+        repetition = []
+        with np.errstate(over='ignore'):
+            for n in (2, 3):
+                if words < n:
+                    continue
+                grams = hashes[:words - n + 1].copy()
+                for offset in range(1, n):
+                    grams = grams * _NGRAM_BASE + hashes[offset:words - n + 1 + offset]
+                repetition.append(1.0 - len(np.unique(grams)) / len(grams))
+        if repetition:
+            features['ngram_repetition'] = float(np.mean(repetition))
+        
+        features['formal_density'] = float(np.isin(hashes, self.lexicon_hashes).mean())
+        return features
+    
+    def analyze(self, text):
+        """Score a text, in the result shape the detect page shows"""
+        features = self.features(text)
+        if features['sentence_cv'] is None:
+            uniformity = 0  # A single sentence says nothing about variation
+        else:
+            spread = self.varied_cv - self.uniform_cv
+            uniformity = _clip_percent((self.varied_cv - features['sentence_cv']) / spread)
+        repetition = _clip_percent(features['ngram_repetition'] / self.repetition_ceiling)
+        formality = _clip_percent(features['formal_density'] / self.formal_ceiling)
+        
+        ai_score = int((formality + repetition + uniformity) / 3)
+        return {
+            "ai_score": ai_score,
+            "human_score": 100 - ai_score,
+            "analysis": {
+                "formal_language": formality,
+                "repetitive_patterns": repetition,
+                "sentence_uniformity": uniformity
+            }
+        }
+
+
+# Analyzer used by detect_ai_content
+stylometric_analyzer = StylometricAnalyzer()
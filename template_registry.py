@@ -0,0 +1,82 @@
+import os
+import time
+
+from flask import current_app, get_flashed_messages, render_template, stream_with_context
+from jinja2 import DictLoader, FileSystemBytecodeCache
+
+import config
+from templates import html_templates
+
+
+class TemplateRegistry:
+    """Compiles the page templates once and renders them by name
+    
+    The app's Jinja environment gets a dict loader over the template sources,
+    so {% extends %} and {% include %} resolve by name and every template is
+    parsed and compiled a single time. The sources never change while the app
+    runs, so templates are not checked for changes. If bytecode_dir is set,
+    compiled templates are also written there and reused by the next worker
+    that boots, skipping the compile step.
+    
+    Large pages can be streamed instead, sent in chunks of stream_buffer
+    template output pieces while the template is still rendering.
+    """
+    
+    def __init__(self, templates, bytecode_dir=None, stream_buffer=32):
+        """Initialize the registry with the template sources by name"""
+        self.templates = templates
+        self.bytecode_dir = bytecode_dir
+        self.stream_buffer = stream_buffer
+        self.compile_time = None
+    
+    def init_app(self, app):
+        """Install the loader on the app and compile every template"""
+        options = dict(app.jinja_options)
+        options['loader'] = DictLoader(self.templates)
+        options['auto_reload'] = False
+        options['cache_size'] = max(400, len(self.templates))
+        if self.bytecode_dir:
+            os.makedirs(self.bytecode_dir, exist_ok=True)
+            options['bytecode_cache'] = FileSystemBytecodeCache(self.bytecode_dir)
+        app.jinja_options = options  # Must be set before app.jinja_env is first used
+    
+        started = time.perf_counter()
+        for name in self.templates:
+            app.jinja_env.get_template(name)
+        self.compile_time = time.perf_counter() - started
+    
+    def render(self, name, **context):
+        """Render a compiled template with the usual Flask context"""
+        return render_template(name, **context)
+    
+    def stream(self, name, **context):
+        """Render a compiled template as a streamed response
+        
+        Iterables in the context, such as rows fetched page by page, are
+        consumed as the output reaches them, so the page is never held in
+        memory as a whole. Flashed messages are taken out of the session
+        up front, because it is saved before the first chunk goes out.
+        """
+        app = current_app._get_current_object()
+        get_flashed_messages()  # Kept on the request for the template
+        app.update_template_context(context)
+        stream = app.jinja_env.get_template(name).stream(context)
+        if self.stream_buffer > 1:
+            stream.enable_buffering(self.stream_buffer)
+        return app.response_class(stream_with_context(stream), mimetype='text/html')
+    
+    def stats(self):
+        """Get the compiled templates and how long compiling them took"""
+        return {
+            'templates': list(self.templates),
+            'compile_time': round(self.compile_time, 4) if self.compile_time is not None else None,
+            'bytecode_dir': self.bytecode_dir or None
+        }
+
+
+# Registry shared by all routes
+template_registry = TemplateRegistry(
+    html_templates,
+    bytecode_dir=config.TEMPLATE_BYTECODE_DIR,
+    stream_buffer=config.TEMPLATE_STREAM_BUFFER
+)
@@ -8,7 +8,7 @@ base_layout = """
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>{{ title }} - Lipia Subscription Service</title>
-    <link rel="stylesheet" href="{{ url_for('static', filename='style.css') }}">
+    <link rel="stylesheet" href="{{ url_for('asset', filename='style.css') }}">
 </head>
 <body>
     <header>
@@ -56,7 +56,7 @@ base_layout = """
         </div>
     </footer>
     
-    <script src="{{ url_for('static', filename='script.js') }}"></script>
+    <script src="{{ url_for('asset', filename='script.js') }}"></script>
 </body>
 </html>
 """
@@ -380,19 +380,16 @@ account_template = """
                     <th>Reference</th>
                 </tr>
             </thead>
-            <tbody>
-                {% for t in transactions %}
-                <tr>
-                    <td>{{ t.date }}</td>
-                    <td>{{ t.subscription_type }}</td>
-                    <td>${{ t.amount }}</td>
-                    <td><span class="status {{ 'success' if t.status == 'Completed' else 'warning' }}">{{ t.status }}</span></td>
-                    <td>{{ t.reference }}</td>
-                </tr>
-                {% endfor %}
+            <tbody id="payment-rows">
+                {% include "payment_rows.html" %}
             </tbody>
         </table>
     </div>
+    {% if transactions.next_page %}
+    <div class="form-actions">
+        <button type="button" class="button secondary load-more" data-url="{{ url_for('account_payments') }}" data-target="payment-rows" data-next-page="{{ transactions.next_page }}">Load more</button>
+    </div>
+    {% endif %}
     {% else %}
     <p>No payment history available.</p>
     {% endif %}
@@ -400,6 +397,19 @@ account_template = """
 {% endblock %}
 """
 
+# Payment history rows, shared by the account page and its "Load more" requests
+payment_rows_template = """
+{% for t in transactions %}
+<tr>
+    <td>{{ t.date }}</td>
+    <td>{{ t.subscription_type }}</td>
+    <td>${{ t.amount }}</td>
+    <td><span class="status {{ 'success' if t.status == 'Completed' else 'warning' }}">{{ t.status }}</span></td>
+    <td>{{ t.reference }}</td>
+</tr>
+{% endfor %}
+"""
+
 # Payment page
 payment_template = """
 {% extends "base.html" %}
@@ -487,6 +497,7 @@ html_templates = {
     'humanize.html': humanize_template,
     'detect.html': detect_template,
     'account.html': account_template,
+    'payment_rows.html': payment_rows_template,
     'payment.html': payment_template,
     'upgrade.html': upgrade_template
 }
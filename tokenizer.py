@@ -0,0 +1,37 @@
+import re
+from array import array
+
+# A word is a run of non-whitespace, the same as str.split() without arguments
+WORD = re.compile(r'\S+')
+
+
+class Tokens:
+    """The result of scanning a text for words"""
+    
+    __slots__ = ('count', 'truncated', 'end', 'offsets')
+    
+    def __init__(self, count, truncated, end, offsets=None):
+        self.count = count  # Words kept, at most the limit
+        self.truncated = truncated  # Whether there were more words than the limit
+        self.end = end  # Index just past the last word kept, the truncation point
+        self.offsets = offsets  # Flat array of start, end pairs if asked for
+
+
+def scan(text, limit=None, offsets=False):
+    """Scan a text once for its words, stopping after limit words
+    
+    Only match positions are kept, never the words themselves, and with a
+    limit the scan ends at the first word past it, so the cost does not
+    depend on how long the rest of the text is.
+    """
+    spans = array('l') if offsets else None
+    count = 0
+    end = 0
+    for match in WORD.finditer(text):
+        if limit is not None and count >= limit:
+            return Tokens(count, True, end, spans)
+        count += 1
+        end = match.end()
+        if spans is not None:
+            spans.extend(match.span())
+    return Tokens(count, False, end, spans)
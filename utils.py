@@ -1,3 +1,4 @@
+import itertools
 import random
 import string
 import re
@@ -7,44 +8,53 @@ import json
 import os
 
 from api_client import api_client
+from rewriter import phrase_rewriter
+import tokenizer
+from stylometry import stylometric_analyzer
+from result_cache import result_cache
+from cache import MISSING
 import config
 
-def humanize_text(text, user_type="Basic"):
+def word_limit(user_type):
+    """Get the most words a plan may humanize at once"""
+    return config.pricing_plans.get(user_type, config.pricing_plans['Free'])['word_limit']
+
+def humanize_text(text, user_type="Basic", tokens=None):
     """
     Call the humanizer API to transform AI text into more human-like text.
     
     Args:
         text (str): The text to humanize
         user_type (str): The user's plan type
+        tokens (Tokens): The text already scanned against the plan's limit, if the caller has it
         
     Returns:
         tuple: (humanized_text, message)
     """
     # This is a placeholder - in a real implementation you'd call your actual text humanization API
     try:
-        # Simulate a response
-        words = text.split()
-        word_count = len(words)
-        
         # Truncate if over limit based on plan
-        limit = 1000 if user_type == "Premium" else 100 if user_type == "Basic" else 500
-        truncated = False
+        limit = word_limit(user_type)
+        
+        # The same text under the same limit was humanized before, the caller has charged for it
+        key = result_cache.key('humanize', text, limit)
+        cached = result_cache.get(key)
+        if cached is not MISSING:
+            return cached
+        
+        if tokens is None:
+            tokens = tokenizer.scan(text, limit)
         message = "Text successfully humanized!"
+        original_length = len(text)
         
-        if word_count > limit:
-            words = words[:limit]
-            truncated = True
+        if tokens.truncated:
+            text = text[:tokens.end]
             message = f"Text was truncated to {limit} words due to your plan limit."
         
-        # Simulated humanization by making small changes
-        humanized_text = text
-        humanized_text = humanized_text.replace("In conclusion", "To sum up")
-        humanized_text = humanized_text.replace("It is important to note", "Keep in mind")
-        humanized_text = humanized_text.replace("In this essay", "Here")
+        # Simulated humanization by rewriting common phrases, in one pass over the text
+        humanized_text = phrase_rewriter.rewrite(text)
         
-        if truncated:
-            humanized_text = " ".join(words)
-            
+        result_cache.set(key, (humanized_text, message), original_length)
         return humanized_text, message
                 
     except Exception as e:
@@ -61,28 +71,13 @@ def detect_ai_content(text):
         dict: Detection results
     """
     try:
-        # Simulated detection
-        # In a real implementation, you would call your actual AI detection API
-        text_length = len(text)
-        
-        # Generate some simulated scores
-        formality_score = random.randint(60, 95)
-        repetition_score = random.randint(40, 90)
-        uniformity_score = random.randint(50, 95)
-        
-        # Calculate AI score
-        ai_score = int((formality_score + repetition_score + uniformity_score) / 3)
-        human_score = 100 - ai_score
-        
-        return {
-            "ai_score": ai_score,
-            "human_score": human_score,
-            "analysis": {
-                "formal_language": formality_score,
-                "repetitive_patterns": repetition_score,
-                "sentence_uniformity": uniformity_score
-            }
-        }
+        key = result_cache.key('detect', text, collapse_whitespace=True)
+        result = result_cache.get(key)
+        if result is MISSING:
+            # Scored locally from sentence, n-gram and vocabulary statistics
+            result = stylometric_analyzer.analyze(text)
+            result_cache.set(key, result, len(text))
+        return result
     except Exception as e:
         return None
 
@@ -134,6 +129,53 @@ def format_date(date_str):
         except ValueError:
             return date_str
 
+def format_payments(payments):
+    """Add a display date to each payment row"""
+    if not isinstance(payments, list):
+        return payments
+    return [dict(payment, date=format_date(payment.get('timestamp', ''))) for payment in payments]
+
+class PaymentHistory:
+    """Payment rows for a page that streams them, fetched a page at a time
+    
+    Iterating yields the rows of the first page, then requests the
+    following pages only as the rows are written out, up to max_pages in
+    all. Afterwards next_page is the page a "Load more" request should
+    fetch, or None once the history is complete. Without a page_size the
+    first page is the whole history.
+    """
+    
+    def __init__(self, username, first_page, page_size=None, max_pages=1):
+        self.username = username
+        self.first_page = first_page
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.next_page = None
+    
+    def __bool__(self):
+        return bool(self.first_page)
+    
+    def __iter__(self):
+        self.next_page = None
+        yield from self.first_page
+        if len(self.first_page) != self.page_size:
+            return
+        
+        page = 1
+        pages = api_client.iter_user_payments(self.username, self.page_size, format_payments,
+                                              start_page=2, previous=self.first_page)
+        for success, payments in itertools.islice(pages, self.max_pages - 1):
+            page += 1
+            if not success or not isinstance(payments, list):
+                self.next_page = page  # Left for "Load more" to retry
+                return
+            yield from payments
+            if len(payments) != self.page_size:
+                return
+        if page < self.max_pages:
+            return  # The backend repeated a page, so there are no more
+        self.next_page = page + 1
+
 def generate_transaction_id():
     """Generate a random transaction ID"""
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=10))